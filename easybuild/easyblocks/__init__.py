@@ -32,6 +32,7 @@ easybuild.easyblocks package declaration
 @author: Jens Timmerman (Ghent University)
 """
 import os
+import sys
 from distutils.version import LooseVersion
 from pkgutil import extend_path
 
@@ -72,20 +73,61 @@ def get_git_revision():
     return res
 
 
-git_rev = get_git_revision()
-if git_rev == UNKNOWN:
-    VERBOSE_VERSION = VERSION
-else:
-    VERBOSE_VERSION = LooseVersion("%s-r%s" % (VERSION, git_rev))
+class VerboseVersion(LooseVersion):
+    """
+    Version that includes the git revision (if available), which is only determined when the version is first used,
+    since determining the git revision is relatively expensive (requires importing GitPython and running 'git')
+    """
+
+    def __init__(self, version):
+        """Initialise verbose version, but do not determine git revision yet."""
+        self.base_version = version
+
+    def __getattr__(self, name):
+        """Determine verbose version when 'vstring' or 'version' attribute is accessed for the first time."""
+        if name in ['vstring', 'version']:
+            git_rev = get_git_revision()
+            if git_rev == UNKNOWN:
+                self.parse(str(self.base_version))
+            else:
+                self.parse("%s-r%s" % (self.base_version, git_rev))
+            return self.__dict__[name]
+        else:
+            raise AttributeError(name)
+
+
+VERBOSE_VERSION = VerboseVersion(VERSION)
+
+
+def _easyblocks_subdir_paths(path):
+    """
+    Determine list of paths to subdirectories of easybuild/easyblocks directories in the Python search path
+    in which easyblocks are located, that are not included yet in specified path.
+    """
+    subdirs = [chr(x) for x in range(ord('a'), ord('z') + 1)] + ['0']
+
+    # only consider existing directories in Python search path, like pkgutil.extend_path does
+    easyblocks_paths = []
+    for sys_path_entry in sys.path:
+        if isinstance(sys_path_entry, str) and os.path.isdir(sys_path_entry):
+            easyblocks_path = os.path.abspath(os.path.join(sys_path_entry, *__name__.split('.')))
+            if os.path.isdir(easyblocks_path) and easyblocks_path not in easyblocks_paths:
+                easyblocks_paths.append(easyblocks_path)
+
+    res = []
+    for subdir in subdirs:
+        for easyblocks_path in easyblocks_paths:
+            subdir_path = os.path.join(easyblocks_path, subdir)
+            if subdir_path not in path and subdir_path not in res and os.path.isdir(subdir_path):
+                res.append(subdir_path)
+
+    return res
 
-# extend path so python finds our easyblocks in the subdirectories where they are located
-subdirs = [chr(x) for x in range(ord('a'), ord('z') + 1)] + ['0']
-for subdir in subdirs:
-    __path__ = extend_path(__path__, '%s.%s' % (__name__, subdir))
 
-del subdir, subdirs, git_rev
-if 'l' in dir():
-    del l
+# extend path so python finds our easyblocks in the subdirectories where they are located;
+# this is equivalent to using extend_path(__path__, 'easybuild.easyblocks.<subdir>') for each of the subdirectories,
+# but the easybuild/easyblocks directories in the Python search path are only determined once, which is a lot faster
+__path__.extend(_easyblocks_subdir_paths(__path__))
 
 # let python know this is not the only place to look for easyblocks, so we can have multiple
 # easybuild/easyblocks paths in the Python search path, next to the official easyblocks distribution
@@ -37,6 +37,7 @@ Support for building and installing Clang, implemented as an easyblock.
 import glob
 import os
 import shutil
+import time
 from distutils.version import LooseVersion
 
 from easybuild.easyblocks.generic.cmakemake import CMakeMake
@@ -44,7 +45,7 @@ from easybuild.framework.easyconfig import CUSTOM
 from easybuild.tools import run
 from easybuild.tools.build_log import EasyBuildError, print_warning
 from easybuild.tools.config import build_option
-from easybuild.tools.filetools import apply_regex_substitutions, change_dir, mkdir
+from easybuild.tools.filetools import apply_regex_substitutions, change_dir, mkdir, write_file
 from easybuild.tools.modules import get_software_root
 from easybuild.tools.run import run_cmd
 from easybuild.tools.systemtools import AARCH32, AARCH64, POWER, X86_64
@@ -64,6 +65,12 @@ DEFAULT_TARGETS_MAP = {
     X86_64: ['X86'],
 }
 
+# sources for smoke test that is run on intermediate bootstrap stages
+SMOKE_TEST_SOURCES = {
+    'hello.c': '#include <stdio.h>\nint main(void) { printf("hello\\n"); return 0; }\n',
+    'hello.cpp': '#include <iostream>\nint main() { std::cout << "hello" << std::endl; return 0; }\n',
+}
+
 
 class EB_Clang(CMakeMake):
     """Support for bootstrapping Clang."""
@@ -88,6 +95,10 @@ class EB_Clang(CMakeMake):
             'default_cuda_capability': [None, "Default CUDA capability specified for clang, e.g. '7.5'", CUSTOM],
             'cuda_compute_capabilities': [[], "List of CUDA compute capabilities to build with", CUSTOM],
             'build_extra_clang_tools': [False, "Build extra Clang tools", CUSTOM],
+            'full_tests_final_stage_only': [False, "Only run full test suite on final stage when bootstrapping, "
+                                                   "just run a quick smoke test on the earlier stages", CUSTOM],
+            'use_ninja': [True, "Use Ninja generator if Ninja is included as (build) dependency "
+                                "and no generator is specified", CUSTOM],
         })
         # disable regular out-of-source build, too simplistic for Clang to work
         extra_vars['separate_build_dir'][0] = False
@@ -102,6 +113,7 @@ class EB_Clang(CMakeMake):
         self.llvm_obj_dir_stage2 = None
         self.llvm_obj_dir_stage3 = None
         self.make_parallel_opts = ""
+        self.build_tool = 'make'
 
     def check_readiness_step(self):
         """Fail early on RHEL 5.x and derivatives because of known bug in libc."""
@@ -297,6 +309,16 @@ class EB_Clang(CMakeMake):
         if self.cfg['parallel']:
             self.make_parallel_opts = "-j %s" % self.cfg['parallel']
 
+        if self.cfg['generator'] is None and self.cfg['use_ninja']:
+            if get_software_root('Ninja'):
+                self.cfg['generator'] = 'Ninja'
+            else:
+                self.log.info("Ninja is not a (build) dependency, so sticking to default CMake generator")
+
+        if self.cfg['generator'] == 'Ninja':
+            self.build_tool = 'ninja'
+        self.log.info("Using '%s' to build Clang", self.build_tool)
+
         # If hwloc is included as a dep, use it in OpenMP runtime for affinity
         hwloc_root = get_software_root('hwloc')
         if hwloc_root:
@@ -377,12 +399,18 @@ class EB_Clang(CMakeMake):
         options += "-DCMAKE_CXX_COMPILER='%s' " % CXX
         options += self.cfg['configopts']
         options += "-DCMAKE_BUILD_TYPE=%s" % self.build_type
+        if self.cfg['generator']:
+            options += ' -G "%s"' % self.cfg['generator']
 
         self.log.info("Configuring")
         run_cmd("cmake %s %s" % (options, self.llvm_src_dir), log_all=True)
 
         self.log.info("Building")
-        run_cmd("make %s" % self.make_parallel_opts, log_all=True)
+        run_cmd(self.build_tool_cmd(), log_all=True)
+
+    def build_tool_cmd(self, target=''):
+        """Return command to build specified target using make or ninja."""
+        return ' '.join(x for x in [self.build_tool, self.make_parallel_opts, target] if x)
 
     def run_clang_tests(self, obj_dir):
         """Run Clang tests in specified directory (unless disabled)."""
@@ -390,26 +418,59 @@ class EB_Clang(CMakeMake):
             change_dir(obj_dir)
 
             self.log.info("Running tests")
-            run_cmd("make %s check-all" % self.make_parallel_opts, log_all=True)
+            start_time = time.time()
+            run_cmd(self.build_tool_cmd(target='check-all'), log_all=True)
+            self.log.info("Running tests in %s took %.1f seconds", obj_dir, time.time() - start_time)
+
+    def run_clang_smoke_test(self, obj_dir):
+        """Run quick smoke test for Clang in specified directory: compile & run 'hello world' in C and C++."""
+        if not self.cfg['skip_all_tests']:
+            smoke_test_dir = os.path.join(obj_dir, 'easybuild_smoke_test')
+            mkdir(smoke_test_dir, parents=True)
+            change_dir(smoke_test_dir)
+
+            self.log.info("Running smoke test")
+            start_time = time.time()
+            for src, comp in [('hello.c', 'clang'), ('hello.cpp', 'clang++')]:
+                write_file(src, SMOKE_TEST_SOURCES[src])
+                exe = os.path.splitext(src)[0] + '_' + src.split('.')[-1]
+                run_cmd("%s %s -o %s && ./%s" % (os.path.join(obj_dir, 'bin', comp), src, exe, exe), log_all=True)
+            self.log.info("Running smoke test in %s took %.1f seconds", obj_dir, time.time() - start_time)
+
+    def run_intermediate_stage_tests(self, obj_dir):
+        """Run tests for intermediate bootstrap stage."""
+        if self.cfg['full_tests_final_stage_only']:
+            self.run_clang_smoke_test(obj_dir)
+        else:
+            self.run_clang_tests(obj_dir)
 
     def build_step(self):
         """Build Clang stage 1, 2, 3"""
 
         # Stage 1: build using system compiler.
         self.log.info("Building stage 1")
+        start_time = time.time()
         change_dir(self.llvm_obj_dir_stage1)
-        super(EB_Clang, self).build_step()
+        if self.build_tool == 'ninja':
+            run_cmd(' '.join([self.cfg['prebuildopts'], self.build_tool_cmd(), self.cfg['buildopts']]), log_all=True)
+        else:
+            super(EB_Clang, self).build_step()
+        self.log.info("Building stage 1 took %.1f seconds", time.time() - start_time)
 
         if self.cfg['bootstrap']:
             # Stage 1: run tests.
-            self.run_clang_tests(self.llvm_obj_dir_stage1)
+            self.run_intermediate_stage_tests(self.llvm_obj_dir_stage1)
 
             self.log.info("Building stage 2")
+            start_time = time.time()
             self.build_with_prev_stage(self.llvm_obj_dir_stage1, self.llvm_obj_dir_stage2)
-            self.run_clang_tests(self.llvm_obj_dir_stage2)
+            self.log.info("Building stage 2 took %.1f seconds", time.time() - start_time)
+            self.run_intermediate_stage_tests(self.llvm_obj_dir_stage2)
 
             self.log.info("Building stage 3")
+            start_time = time.time()
             self.build_with_prev_stage(self.llvm_obj_dir_stage2, self.llvm_obj_dir_stage3)
+            self.log.info("Building stage 3 took %.1f seconds", time.time() - start_time)
             # Don't run stage 3 tests here, do it in the test step.
 
     def test_step(self):
@@ -426,7 +487,12 @@ class EB_Clang(CMakeMake):
             change_dir(self.llvm_obj_dir_stage3)
         else:
             change_dir(self.llvm_obj_dir_stage1)
-        super(EB_Clang, self).install_step()
+
+        if self.build_tool == 'ninja':
+            run_cmd(' '.join([self.cfg['preinstallopts'], self.build_tool_cmd(target='install'),
+                              self.cfg['installopts']]), log_all=True)
+        else:
+            super(EB_Clang, self).install_step()
 
         # the static analyzer is not installed by default
         # we do it by hand
@@ -27,20 +27,30 @@ EasyBuild support for building and installing FFTW, implemented as an easyblock
 
 @author: Kenneth Hoste (HPC-UGent)
 """
+import os
+import time
 from distutils.version import LooseVersion
 
 import easybuild.tools.toolchain as toolchain
 from easybuild.easyblocks.generic.configuremake import ConfigureMake
+from easybuild.easyblocks.utilities import get_fork_context
 from easybuild.framework.easyconfig import CUSTOM
 from easybuild.toolchains.compiler.gcc import TC_CONSTANT_GCC
 from easybuild.tools.build_log import EasyBuildError
 from easybuild.tools.config import build_option
+from easybuild.tools.filetools import change_dir, mkdir
 from easybuild.tools.modules import get_software_version
 from easybuild.tools.systemtools import AARCH32, AARCH64, POWER, X86_64
 from easybuild.tools.systemtools import get_cpu_architecture, get_cpu_features, get_shared_lib_ext
 from easybuild.tools.toolchain.compiler import OPTARCH_GENERIC
 from easybuild.tools.utilities import nub
 
+try:
+    from queue import Empty
+except ImportError:
+    # Python 2
+    from Queue import Empty
+
 
 # AVX*, FMA4 (AMD Bulldozer+ only), SSE2 (x86_64 only)
 FFTW_CPU_FEATURE_FLAGS_SINGLE_DOUBLE = ['avx', 'avx2', 'avx512', 'fma4', 'sse2', 'vsx']
@@ -50,6 +60,14 @@ FFTW_CPU_FEATURE_FLAGS = FFTW_CPU_FEATURE_FLAGS_SINGLE_DOUBLE + ['altivec', 'asi
 FFTW_PRECISION_FLAGS = ['single', 'double', 'long-double', 'quad-precision']
 
 
+def configure_build_prec_worker(fftw, prec, prec_configopts, objdir, parallel, results):
+    """Configure and build FFTW for specified precision (in a worker process), report result via specified queue."""
+    try:
+        results.put((prec, fftw.configure_build_prec(prec_configopts, objdir, parallel), None))
+    except Exception as err:
+        results.put((prec, None, str(err)))
+
+
 class EB_FFTW(ConfigureMake):
     """Support for building/installing FFTW."""
 
@@ -63,6 +81,9 @@ class EB_FFTW(ConfigureMake):
         """Custom easyconfig parameters for FFTW."""
         extra_vars = {
             'auto_detect_cpu_features': [True, "Auto-detect available CPU features, and configure accordingly", CUSTOM],
+            'parallel_precisions': [False, "Configure and build for all precisions concurrently, each in a separate "
+                                           "build directory (installation is still done one precision at a time)",
+                                    CUSTOM],
             'use_fma': [None, "Configure with --enable-avx-128-fma (DEPRECATED, use 'use_fma4' instead)", CUSTOM],
             'with_mpi': [True, "Enable building of FFTW MPI library", CUSTOM],
             'with_openmp': [True, "Enable building of FFTW OpenMP library", CUSTOM],
@@ -139,6 +160,9 @@ class EB_FFTW(ConfigureMake):
                     self.log.info("Enabling use of %s (should be supported based on CPU features)", flag.upper())
                     setattr(self, flag, True)
 
+        # list of (precision, configure options, build directory) tuples, when building precisions concurrently
+        self.prec_builds = []
+
         # Auto-disable quad-precision on ARM and POWER, as it is unsupported
         if self.cfg['with_quad_prec'] and cpu_arch in [AARCH32, AARCH64, POWER]:
             self.cfg['with_quad_prec'] = False
@@ -152,6 +176,7 @@ class EB_FFTW(ConfigureMake):
         common_config_opts = self.cfg['configopts']
 
         self.cfg['configopts'] = []
+        self.prec_builds = []
 
         for prec in FFTW_PRECISION_FLAGS:
             if self.cfg[EB_FFTW._prec_param(prec)]:
@@ -208,12 +233,99 @@ class EB_FFTW(ConfigureMake):
                         prec_configopts.append('--disable-vsx')
 
                 # append additional configure options (may be empty string, but that's OK)
-                self.cfg.update('configopts', [' '.join(prec_configopts) + ' ' + common_config_opts])
+                prec_configopts = ' '.join(prec_configopts) + ' ' + common_config_opts
+                if self.cfg['parallel_precisions']:
+                    self.prec_builds.append((prec, prec_configopts, None))
+                else:
+                    self.cfg.update('configopts', [prec_configopts])
 
-        self.log.debug("List of configure options to iterate over: %s", self.cfg['configopts'])
+        if self.prec_builds:
+            # single iteration, configure options for each precision are passed down in configure_step
+            self.cfg['configopts'] = common_config_opts
+            self.log.debug("List of configure options for concurrent builds: %s", self.prec_builds)
+        else:
+            self.log.debug("List of configure options to iterate over: %s", self.cfg['configopts'])
 
         return super(EB_FFTW, self).run_all_steps(*args, **kwargs)
 
+    def configure_step(self):
+        """
+        Configure FFTW; when building for all precisions concurrently,
+        only create separate build directory for each precision (actual configuration is done in build step).
+        """
+        if self.prec_builds:
+            for idx, (prec, prec_configopts, _) in enumerate(self.prec_builds):
+                objdir = os.path.join(self.builddir, 'easybuild_obj_%s' % prec)
+                mkdir(objdir, parents=True)
+                self.prec_builds[idx] = (prec, prec_configopts, objdir)
+        else:
+            super(EB_FFTW, self).configure_step()
+
+    def configure_build_prec(self, prec_configopts, objdir, parallel):
+        """
+        Configure and build FFTW in specified build directory (out-of-tree), using specified configure options.
+
+        :return: time (in seconds) spent on configuring and building
+        """
+        start_time = time.time()
+
+        orig_configopts, orig_parallel = self.cfg['configopts'], self.cfg['parallel']
+        self.cfg['configopts'], self.cfg['parallel'] = prec_configopts, parallel
+        try:
+            change_dir(objdir)
+            super(EB_FFTW, self).configure_step(cmd_prefix=os.path.join(self.cfg['start_dir'], ''))
+            super(EB_FFTW, self).build_step()
+        finally:
+            self.cfg['configopts'], self.cfg['parallel'] = orig_configopts, orig_parallel
+
+        return time.time() - start_time
+
+    def build_step(self):
+        """
+        Build FFTW; when building for all precisions concurrently, configure and build for each precision
+        in a separate worker process, with the available cores split between them.
+        """
+        if not self.prec_builds:
+            return super(EB_FFTW, self).build_step()
+
+        parallel = max(1, (self.cfg['parallel'] or 1) // len(self.prec_builds))
+
+        if self.dry_run:
+            for (_, prec_configopts, objdir) in self.prec_builds:
+                self.configure_build_prec(prec_configopts, objdir, parallel)
+            return
+
+        mp_ctx = get_fork_context()
+        results = mp_ctx.Queue()
+        running = {}
+        for (prec, prec_configopts, objdir) in self.prec_builds:
+            self.log.info("Configuring and building FFTW for %s precision in %s (using %d cores)",
+                          prec, objdir, parallel)
+            args = (self, prec, prec_configopts, objdir, parallel, results)
+            running[prec] = mp_ctx.Process(target=configure_build_prec_worker, args=args)
+            running[prec].start()
+
+        errors = []
+        while running:
+            try:
+                prec, build_time, err = results.get(timeout=5)
+            except Empty:
+                # check for worker processes that died without reporting back (killed, crashed, ...)
+                for prec, proc in list(running.items()):
+                    if not proc.is_alive() and results.empty():
+                        errors.append("%s precision: worker process died (exit code %s)" % (prec, proc.exitcode))
+                        del running[prec]
+                continue
+
+            running.pop(prec).join()
+            if err is None:
+                self.log.info("Configuring and building FFTW for %s precision took %.1f seconds", prec, build_time)
+            else:
+                errors.append("%s precision: %s" % (prec, err))
+
+        if errors:
+            raise EasyBuildError("Failed to configure/build FFTW: %s", '; '.join(errors))
+
     def test_step(self):
         """Custom implementation of test step for FFTW."""
 
@@ -226,7 +338,23 @@ class EB_FFTW(ConfigureMake):
                 if 'OMPI_MCA_rmaps_base_oversubscribe' not in self.cfg['pretestopts']:
                     self.cfg.update('pretestopts', "export OMPI_MCA_rmaps_base_oversubscribe=true && ")
 
-        super(EB_FFTW, self).test_step()
+        if self.prec_builds:
+            for (prec, _, objdir) in self.prec_builds:
+                self.log.info("Testing FFTW for %s precision in %s", prec, objdir)
+                change_dir(objdir)
+                super(EB_FFTW, self).test_step()
+        else:
+            super(EB_FFTW, self).test_step()
+
+    def install_step(self):
+        """Install FFTW; when precisions were built concurrently, install them one at a time."""
+        if self.prec_builds:
+            for (prec, _, objdir) in self.prec_builds:
+                self.log.info("Installing FFTW for %s precision from %s", prec, objdir)
+                change_dir(objdir)
+                super(EB_FFTW, self).install_step()
+        else:
+            super(EB_FFTW, self).install_step()
 
     def sanity_check_step(self):
         """Custom sanity check for FFTW."""
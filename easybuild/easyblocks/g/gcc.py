@@ -38,8 +38,10 @@ import glob
 import os
 import re
 import shutil
+import time
 from copy import copy
 from distutils.version import LooseVersion
+from multiprocessing.pool import ThreadPool
 
 import easybuild.tools.environment as env
 from easybuild.easyblocks.generic.configuremake import ConfigureMake
@@ -54,6 +56,12 @@ from easybuild.tools.systemtools import get_gcc_version, get_shared_lib_ext
 from easybuild.tools.toolchain.compiler import OPTARCH_GENERIC
 from easybuild.tools.utilities import nub
 
+try:
+    from queue import Queue
+except ImportError:
+    # Python 2
+    from Queue import Queue
+
 
 COMP_CMD_SYMLINKS = {
     'cc': 'gcc',
@@ -264,9 +272,11 @@ class EB_GCC(ConfigureMake):
             'versions': versions
         }
 
-    def run_configure_cmd(self, cmd):
+    def run_configure_cmd(self, cmd, path=None):
         """
         Run a configure command, with some extra checking (e.g. for unrecognized options).
+
+        :param path: directory to run configure command in (via 'cd', without changing the working directory)
         """
         # note: this also triggers the use of an updated config.guess script
         # (unless both the 'build_type' and 'host_type' easyconfig parameters are specified)
@@ -276,7 +286,11 @@ class EB_GCC(ConfigureMake):
         if host_type:
             cmd += ' --host=' + host_type
 
-        (out, ec) = run_cmd("%s %s" % (self.cfg['preconfigopts'], cmd), log_all=True, simple=False)
+        cmd = "%s %s" % (self.cfg['preconfigopts'], cmd)
+        if path:
+            cmd = "cd %s && %s" % (path, cmd)
+
+        (out, ec) = run_cmd(cmd, log_all=True, simple=False)
 
         if ec != 0:
             raise EasyBuildError("Command '%s' exited with exit code != 0 (%s)", cmd, ec)
@@ -289,6 +303,181 @@ class EB_GCC(ConfigureMake):
         if unknown_options:
             raise EasyBuildError("Unrecognized options found during configure: %s", unknown_options)
 
+    def stage2_configure_cmd(self, lib, stage2prefix, stage2_info):
+        """
+        Determine configure command for library (GMP, PPL, ISL, CLooG) to build in stage 2 of a staged build.
+        """
+        if lib == "gmp":
+            cmd = "./configure --prefix=%s " % stage2prefix
+            cmd += "--with-pic --disable-shared --enable-cxx "
+
+            # ensure generic build when 'generic' is set to True or when --optarch=GENERIC is used
+            # non-generic build can be enforced with generic=False if --optarch=GENERIC is used
+            optarch_generic = build_option('optarch') == OPTARCH_GENERIC
+            if self.cfg['generic'] or (optarch_generic and self.cfg['generic'] is not False):
+                cmd += "--enable-fat "
+
+        elif lib == "ppl":
+            self.pplver = LooseVersion(stage2_info['versions']['ppl'])
+
+            cmd = "./configure --prefix=%s --with-pic -disable-shared " % stage2prefix
+            # only enable C/C++ interfaces (Java interface is sometimes troublesome)
+            cmd += "--enable-interfaces='c c++' "
+
+            # enable watchdog (or not)
+            if self.pplver <= LooseVersion("0.11"):
+                if self.cfg['pplwatchdog']:
+                    cmd += "--enable-watchdog "
+                else:
+                    cmd += "--disable-watchdog "
+            elif self.cfg['pplwatchdog']:
+                raise EasyBuildError("Enabling PPL watchdog only supported in PPL <= v0.11 .")
+
+            # make sure GMP we just built is found
+            cmd += "--with-gmp=%s " % stage2prefix
+        elif lib == "isl":
+            cmd = "./configure --prefix=%s --with-pic --disable-shared " % stage2prefix
+            cmd += "--with-gmp=system --with-gmp-prefix=%s " % stage2prefix
+
+            # ensure generic build when 'generic' is set to True or when --optarch=GENERIC is used
+            # non-generic build can be enforced with generic=False if --optarch=GENERIC is used
+            optarch_generic = build_option('optarch') == OPTARCH_GENERIC
+            if self.cfg['generic'] or (optarch_generic and self.cfg['generic'] is not False):
+                cmd += "--without-gcc-arch "
+
+        elif lib == "cloog":
+            self.cloogname = stage2_info['names']['cloog']
+            self.cloogver = LooseVersion(stage2_info['versions']['cloog'])
+            v0_15 = LooseVersion("0.15")
+            v0_16 = LooseVersion("0.16")
+
+            cmd = "./configure --prefix=%s --with-pic --disable-shared " % stage2prefix
+
+            # use ISL or PPL
+            if self.cfg['clooguseisl']:
+                if self.cfg['withisl']:
+                    self.log.debug("Using external ISL for CLooG")
+                    cmd += "--with-isl=system --with-isl-prefix=%s " % stage2prefix
+                elif self.cloogver >= v0_16:
+                    self.log.debug("Using bundled ISL for CLooG")
+                    cmd += "--with-isl=bundled "
+                else:
+                    raise EasyBuildError("Using ISL is only supported in CLooG >= v0.16 (detected v%s).",
+                                         self.cloogver)
+            else:
+                if self.cloogname == "cloog-ppl" and self.cloogver >= v0_15 and self.cloogver < v0_16:
+                    cmd += "--with-ppl=%s " % stage2prefix
+                else:
+                    errormsg = "PPL only supported with CLooG-PPL v0.15.x (detected v%s)" % self.cloogver
+                    errormsg += "\nNeither using PPL or ISL-based ClooG, I'm out of options..."
+                    raise EasyBuildError(errormsg)
+
+            # make sure GMP is found
+            if self.cloogver >= v0_15 and self.cloogver < v0_16:
+                cmd += "--with-gmp=%s " % stage2prefix
+            elif self.cloogver >= v0_16:
+                cmd += "--with-gmp=system --with-gmp-prefix=%s " % stage2prefix
+            else:
+                raise EasyBuildError("Don't know how to specify location of GMP to configure of CLooG v%s.",
+                                     self.cloogver)
+        else:
+            raise EasyBuildError("Don't know how to configure for %s", lib)
+
+        return cmd
+
+    def build_stage2_lib(self, lib, libdir, configure_cmd, parallel):
+        """
+        Configure, build and install library in specified directory, for stage 2 of a staged build.
+        Commands are run in the library directory via 'cd', rather than changing the working directory,
+        so multiple libraries can be built concurrently.
+
+        :return: time (in seconds) it took to build and install the library
+        """
+        self.log.debug("Building %s in stage 2 in %s", lib, libdir)
+        start_time = time.time()
+
+        self.run_configure_cmd(configure_cmd, path=libdir)
+
+        # build and 'install'
+        for cmd in ["make -j %s" % parallel, "make install"]:
+            run_cmd("cd %s && %s" % (libdir, cmd), log_all=True, simple=True)
+
+        return time.time() - start_time
+
+    def build_stage2_libs(self, libs, stage2prefix, stage2_info):
+        """
+        Build libraries (GMP, PPL, ISL, CLooG) for stage 2 of a staged build;
+        libraries that do not depend on each other are built concurrently, sharing the available cores.
+        """
+        # determine dependencies between libraries that are being built
+        lib_deps = {}
+        for lib in libs:
+            if lib == 'gmp':
+                deps = []
+            elif lib in ['isl', 'ppl']:
+                deps = ['gmp']
+            elif lib == 'cloog':
+                deps = ['gmp', 'isl' if self.cfg['clooguseisl'] else 'ppl']
+            else:
+                raise EasyBuildError("Don't know dependencies for %s", lib)
+            lib_deps[lib] = [dep for dep in deps if dep in libs]
+
+        parallel = self.cfg['parallel'] or 1
+
+        def build_lib(lib, configure_cmd, jobs):
+            """
+            Build specified library, return result as (lib, build time, error) tuple;
+            any error must be caught and reported here, since a result is expected for every library being built
+            """
+            try:
+                return (lib, self.build_stage2_lib(lib, os.path.join(stage2prefix, lib), configure_cmd, jobs), None)
+            except EasyBuildError as err:
+                return (lib, None, err)
+            except Exception as err:
+                return (lib, None, EasyBuildError("Failed to build %s in stage 2: %s", lib, err))
+
+        results = Queue()
+        pool = ThreadPool(processes=len(libs))
+        pending, running, done, errors = libs[:], [], [], []
+        try:
+            while pending or running:
+                ready = [lib for lib in pending if all(dep in done for dep in lib_deps[lib])]
+                if not errors:
+                    # divide available cores over all libraries that are being built at the same time
+                    jobs = max(1, parallel // (len(running) + len(ready) or 1))
+                    for lib in ready:
+                        self.log.info("Building %s in stage 2 (using %d cores)", lib, jobs)
+                        # configure command is determined first, since some attributes are set along the way
+                        configure_cmd = self.stage2_configure_cmd(lib, stage2prefix, stage2_info)
+                        pool.apply_async(build_lib, (lib, configure_cmd, jobs), callback=results.put)
+                        pending.remove(lib)
+                        running.append(lib)
+
+                if not running:
+                    break
+
+                lib, build_time, err = results.get()
+                running.remove(lib)
+                if err is None:
+                    self.log.info("Building %s in stage 2 took %.1f seconds", lib, build_time)
+                    done.append(lib)
+
+                    if lib == "gmp":
+                        # make sure correct GMP is found
+                        libpath = os.path.join(stage2prefix, 'lib')
+                        incpath = os.path.join(stage2prefix, 'include')
+
+                        cppflags = os.getenv('CPPFLAGS', '')
+                        env.setvar('CPPFLAGS', "%s -L%s -I%s " % (cppflags, libpath, incpath))
+                else:
+                    errors.append(err)
+        finally:
+            pool.terminate()
+            pool.join()
+
+        if errors:
+            raise errors[0]
+
     def configure_step(self):
         """
         Configure for GCC build:
@@ -497,108 +686,8 @@ class EB_GCC(ConfigureMake):
             configopts = stage2_info['configopts']
 
             # build PPL and CLooG (GMP as dependency)
-
-            for lib in ["gmp"] + self.with_dirs:
-                self.log.debug("Building %s in stage 2" % lib)
-                if lib == "gmp" or self.cfg['with%s' % lib]:
-                    libdir = os.path.join(stage2prefix, lib)
-                    try:
-                        os.chdir(libdir)
-                    except OSError as err:
-                        raise EasyBuildError("Failed to change to %s: %s", libdir, err)
-                    if lib == "gmp":
-                        cmd = "./configure --prefix=%s " % stage2prefix
-                        cmd += "--with-pic --disable-shared --enable-cxx "
-
-                        # ensure generic build when 'generic' is set to True or when --optarch=GENERIC is used
-                        # non-generic build can be enforced with generic=False if --optarch=GENERIC is used
-                        optarch_generic = build_option('optarch') == OPTARCH_GENERIC
-                        if self.cfg['generic'] or (optarch_generic and self.cfg['generic'] is not False):
-                            cmd += "--enable-fat "
-
-                    elif lib == "ppl":
-                        self.pplver = LooseVersion(stage2_info['versions']['ppl'])
-
-                        cmd = "./configure --prefix=%s --with-pic -disable-shared " % stage2prefix
-                        # only enable C/C++ interfaces (Java interface is sometimes troublesome)
-                        cmd += "--enable-interfaces='c c++' "
-
-                        # enable watchdog (or not)
-                        if self.pplver <= LooseVersion("0.11"):
-                            if self.cfg['pplwatchdog']:
-                                cmd += "--enable-watchdog "
-                            else:
-                                cmd += "--disable-watchdog "
-                        elif self.cfg['pplwatchdog']:
-                            raise EasyBuildError("Enabling PPL watchdog only supported in PPL <= v0.11 .")
-
-                        # make sure GMP we just built is found
-                        cmd += "--with-gmp=%s " % stage2prefix
-                    elif lib == "isl":
-                        cmd = "./configure --prefix=%s --with-pic --disable-shared " % stage2prefix
-                        cmd += "--with-gmp=system --with-gmp-prefix=%s " % stage2prefix
-
-                        # ensure generic build when 'generic' is set to True or when --optarch=GENERIC is used
-                        # non-generic build can be enforced with generic=False if --optarch=GENERIC is used
-                        optarch_generic = build_option('optarch') == OPTARCH_GENERIC
-                        if self.cfg['generic'] or (optarch_generic and self.cfg['generic'] is not False):
-                            cmd += "--without-gcc-arch "
-
-                    elif lib == "cloog":
-                        self.cloogname = stage2_info['names']['cloog']
-                        self.cloogver = LooseVersion(stage2_info['versions']['cloog'])
-                        v0_15 = LooseVersion("0.15")
-                        v0_16 = LooseVersion("0.16")
-
-                        cmd = "./configure --prefix=%s --with-pic --disable-shared " % stage2prefix
-
-                        # use ISL or PPL
-                        if self.cfg['clooguseisl']:
-                            if self.cfg['withisl']:
-                                self.log.debug("Using external ISL for CLooG")
-                                cmd += "--with-isl=system --with-isl-prefix=%s " % stage2prefix
-                            elif self.cloogver >= v0_16:
-                                self.log.debug("Using bundled ISL for CLooG")
-                                cmd += "--with-isl=bundled "
-                            else:
-                                raise EasyBuildError("Using ISL is only supported in CLooG >= v0.16 (detected v%s).",
-                                                     self.cloogver)
-                        else:
-                            if self.cloogname == "cloog-ppl" and self.cloogver >= v0_15 and self.cloogver < v0_16:
-                                cmd += "--with-ppl=%s " % stage2prefix
-                            else:
-                                errormsg = "PPL only supported with CLooG-PPL v0.15.x (detected v%s)" % self.cloogver
-                                errormsg += "\nNeither using PPL or ISL-based ClooG, I'm out of options..."
-                                raise EasyBuildError(errormsg)
-
-                        # make sure GMP is found
-                        if self.cloogver >= v0_15 and self.cloogver < v0_16:
-                            cmd += "--with-gmp=%s " % stage2prefix
-                        elif self.cloogver >= v0_16:
-                            cmd += "--with-gmp=system --with-gmp-prefix=%s " % stage2prefix
-                        else:
-                            raise EasyBuildError("Don't know how to specify location of GMP to configure of CLooG v%s.",
-                                                 self.cloogver)
-                    else:
-                        raise EasyBuildError("Don't know how to configure for %s", lib)
-
-                    # configure
-                    self.run_configure_cmd(cmd)
-
-                    # build and 'install'
-                    cmd = "make %s" % paracmd
-                    run_cmd(cmd, log_all=True, simple=True)
-
-                    cmd = "make install"
-                    run_cmd(cmd, log_all=True, simple=True)
-
-                    if lib == "gmp":
-                        # make sure correct GMP is found
-                        libpath = os.path.join(stage2prefix, 'lib')
-                        incpath = os.path.join(stage2prefix, 'include')
-
-                        cppflags = os.getenv('CPPFLAGS', '')
-                        env.setvar('CPPFLAGS', "%s -L%s -I%s " % (cppflags, libpath, incpath))
+            libs = [lib for lib in ["gmp"] + self.with_dirs if lib == "gmp" or self.cfg['with%s' % lib]]
+            self.build_stage2_libs(libs, stage2prefix, stage2_info)
 
             #
             # STAGE 3: bootstrap build of final GCC (with PPL/CLooG support)
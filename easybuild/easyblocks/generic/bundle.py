@@ -33,15 +33,38 @@ EasyBuild support for installing a bundle of modules, implemented as a generic e
 """
 import copy
 import os
+import time
 
 import easybuild.tools.environment as env
+from easybuild.easyblocks.utilities import get_fork_context
 from easybuild.framework.easyblock import EasyBlock
 from easybuild.framework.easyconfig import CUSTOM
 from easybuild.framework.easyconfig.easyconfig import get_easyblock_class
 from easybuild.tools.build_log import EasyBuildError, print_msg
+from easybuild.tools.filetools import change_dir
 from easybuild.tools.modules import get_software_root, get_software_version
 from easybuild.tools.py2vs3 import string_type
 
+try:
+    from queue import Empty
+except ImportError:
+    # Python 2
+    from Queue import Empty
+
+
+def install_component_worker(bundle, idx, comp, results):
+    """
+    Install component of bundle (in a worker process), and report result via specified queue.
+
+    Since changes made to the component easyblock instance in the worker process are lost,
+    the module requirements for the component are determined here and reported back as well.
+    """
+    try:
+        wall_time = bundle.install_component(comp)
+        results.put((idx, (wall_time, comp.make_module_req_guess()), None))
+    except Exception as err:
+        results.put((idx, None, str(err)))
+
 
 class Bundle(EasyBlock):
     """
@@ -59,6 +82,11 @@ class Bundle(EasyBlock):
             'default_component_specs': [{}, "Default specs to use for every component", CUSTOM],
             'components': [(), "List of components to install: tuples w/ name, version and easyblock to use", CUSTOM],
             'default_easyblock': [None, "Default easyblock to use for components", CUSTOM],
+            'component_deps': [[], "List of names of other components that must be installed before this component "
+                                   "(only relevant when components are installed concurrently)", CUSTOM],
+            'parallel_components': [1, "Maximum number of components to install concurrently (only safe for "
+                                       "components for which the easyblock does not set state during installation "
+                                       "that is required afterwards, other than the module requirements)", CUSTOM],
         })
         return EasyBlock.extra_options(extra_vars)
 
@@ -193,78 +221,197 @@ class Bundle(EasyBlock):
         """Do nothing."""
         pass
 
-    def install_step(self):
-        """Install components, if specified."""
-        comp_cnt = len(self.cfg['components'])
-        for idx, cfg in enumerate(self.comp_cfgs):
-
-            print_msg("installing bundle component %s v%s (%d/%d)..." %
-                      (cfg['name'], cfg['version'], idx + 1, comp_cnt))
-            self.log.info("Installing component %s v%s using easyblock %s", cfg['name'], cfg['version'], cfg.easyblock)
+    def prepare_component(self, cfg, src_specs):
+        """
+        Create easyblock instance for specified component, and prepare it for installation.
 
-            comp = cfg.easyblock(cfg)
+        :param cfg: EasyConfig instance for component
+        :param src_specs: dict with source spec for each source file name
+        """
+        comp = cfg.easyblock(cfg)
 
-            # correct build/install dirs
-            comp.builddir = self.builddir
-            comp.install_subdir, comp.installdir = self.install_subdir, self.installdir
+        # correct build/install dirs
+        comp.builddir = self.builddir
+        comp.install_subdir, comp.installdir = self.install_subdir, self.installdir
 
-            # make sure we can build in parallel
-            comp.set_parallel()
+        # make sure we can build in parallel
+        comp.set_parallel()
 
-            # figure out correct start directory
-            comp.guess_start_dir()
+        # figure out correct start directory
+        comp.guess_start_dir()
 
-            # need to run fetch_patches to ensure per-component patches are applied
-            comp.fetch_patches()
+        # need to run fetch_patches to ensure per-component patches are applied
+        comp.fetch_patches()
 
-            comp.src = []
+        comp.src = []
 
-            # find match entries in self.src for this component
-            for source in comp.cfg['sources']:
-                if isinstance(source, string_type):
-                    comp_src_fn = source
-                elif isinstance(source, dict):
-                    if 'filename' in source:
-                        comp_src_fn = source['filename']
-                    else:
-                        raise EasyBuildError("Encountered source file specified as dict without 'filename': %s", source)
-                else:
-                    raise EasyBuildError("Specification of unknown type for source file: %s", source)
-
-                found = False
-                for src in self.src:
-                    if src['name'] == comp_src_fn:
-                        self.log.info("Found spec for source %s for component %s: %s", comp_src_fn, comp.name, src)
-                        comp.src.append(src)
-                        found = True
-                        break
-                if not found:
-                    raise EasyBuildError("Failed to find spec for source %s for component %s", comp_src_fn, comp.name)
-
-                # location of first unpacked source is used to determine where to apply patch(es)
-                comp.src[-1]['finalpath'] = comp.cfg['start_dir']
-
-            # run relevant steps
-            for step_name in ['patch', 'configure', 'build', 'install']:
-                if step_name in cfg['skipsteps']:
-                    comp.log.info("Skipping '%s' step for component %s v%s", step_name, cfg['name'], cfg['version'])
+        # find match entries in self.src for this component
+        for source in comp.cfg['sources']:
+            if isinstance(source, string_type):
+                comp_src_fn = source
+            elif isinstance(source, dict):
+                if 'filename' in source:
+                    comp_src_fn = source['filename']
                 else:
-                    comp.run_step(step_name, [lambda x: getattr(x, '%s_step' % step_name)])
+                    raise EasyBuildError("Encountered source file specified as dict without 'filename': %s", source)
+            else:
+                raise EasyBuildError("Specification of unknown type for source file: %s", source)
+
+            if comp_src_fn in src_specs:
+                src = src_specs[comp_src_fn]
+                self.log.info("Found spec for source %s for component %s: %s", comp_src_fn, comp.name, src)
+                comp.src.append(src)
+            else:
+                raise EasyBuildError("Failed to find spec for source %s for component %s", comp_src_fn, comp.name)
+
+            # location of first unpacked source is used to determine where to apply patch(es)
+            comp.src[-1]['finalpath'] = comp.cfg['start_dir']
+
+        return comp
+
+    def install_component(self, comp):
+        """Run relevant steps to install specified component."""
+        cfg = comp.cfg
+        start_time = time.time()
+
+        # start in start directory of this component, since all components are prepared up front
+        # when they are installed concurrently
+        if cfg['start_dir']:
+            change_dir(cfg['start_dir'])
+
+        for step_name in ['patch', 'configure', 'build', 'install']:
+            if step_name in cfg['skipsteps']:
+                comp.log.info("Skipping '%s' step for component %s v%s", step_name, cfg['name'], cfg['version'])
+            else:
+                comp.run_step(step_name, [lambda x: getattr(x, '%s_step' % step_name)])
+
+        return time.time() - start_time
 
-            # update environment to ensure stuff provided by former components can be picked up by latter components
-            # once the installation is finalised, this is handled by the generated module
+    def update_env_for_component(self, comp, reqs=None):
+        """
+        Update environment to ensure stuff provided by former components can be picked up by latter components.
+        Once the installation is finalised, this is handled by the generated module.
+
+        :param comp: easyblock instance for component
+        :param reqs: module requirements for component (determined via make_module_req_guess if None)
+        """
+        if reqs is None:
             reqs = comp.make_module_req_guess()
-            for envvar in reqs:
-                curr_val = os.getenv(envvar, '')
-                curr_paths = curr_val.split(os.pathsep)
-                for subdir in reqs[envvar]:
-                    path = os.path.join(self.installdir, subdir)
-                    if path not in curr_paths:
-                        if curr_val:
-                            new_val = '%s:%s' % (path, curr_val)
-                        else:
-                            new_val = path
-                        env.setvar(envvar, new_val)
+        for envvar in reqs:
+            curr_val = os.getenv(envvar, '')
+            curr_paths = curr_val.split(os.pathsep)
+            for subdir in reqs[envvar]:
+                path = os.path.join(self.installdir, subdir)
+                if path not in curr_paths:
+                    if curr_val:
+                        new_val = '%s:%s' % (path, curr_val)
+                    else:
+                        new_val = path
+                    env.setvar(envvar, new_val)
+
+    def install_components_concurrently(self, comps, max_workers):
+        """
+        Install components concurrently, each in a separate worker process,
+        taking into account the dependencies between components specified via 'component_deps'.
+
+        :param comps: list of easyblock instances for components
+        :param max_workers: maximum number of components to install concurrently
+        """
+        comp_names = [comp.cfg['name'] for comp in comps]
+        for comp in comps:
+            unknown_deps = [dep for dep in comp.cfg['component_deps'] if dep not in comp_names]
+            if unknown_deps:
+                raise EasyBuildError("Unknown component(s) listed in 'component_deps' for component %s: %s",
+                                     comp.cfg['name'], ', '.join(unknown_deps))
+
+        mp_ctx = get_fork_context()
+        results = mp_ctx.Queue()
+        pending = list(range(len(comps)))
+        running, done, errors = {}, set(), []
+
+        while pending or running:
+            # start installation of components for which all required components are installed,
+            # unless something went wrong already
+            for idx in pending[:]:
+                if errors or len(running) >= max_workers:
+                    break
+                cfg = comps[idx].cfg
+                if all(dep in done for dep in cfg['component_deps']):
+                    print_msg("installing bundle component %s v%s (%d/%d)..." %
+                              (cfg['name'], cfg['version'], idx + 1, len(comps)))
+                    self.log.info("Installing component %s v%s using easyblock %s",
+                                  cfg['name'], cfg['version'], cfg.easyblock)
+                    proc = mp_ctx.Process(target=install_component_worker, args=(self, idx, comps[idx], results))
+                    proc.start()
+                    running[idx] = proc
+                    pending.remove(idx)
+
+            if not running:
+                if pending and not errors:
+                    pending_names = [comps[idx].cfg['name'] for idx in pending]
+                    raise EasyBuildError("Failed to resolve dependencies between components %s",
+                                         ', '.join(pending_names))
+                break
+
+            try:
+                idx, res, err = results.get(timeout=5)
+            except Empty:
+                # check for worker processes that died without reporting back
+                for idx, proc in list(running.items()):
+                    if not proc.is_alive() and proc.exitcode:
+                        errors.append("installation of component %s failed (exit code %s)" %
+                                      (comps[idx].cfg['name'], proc.exitcode))
+                        del running[idx]
+                continue
+
+            running.pop(idx).join()
+            comp = comps[idx]
+            if err is None:
+                wall_time, reqs = res
+                self.log.info("Installation of component %s v%s took %.1f seconds",
+                              comp.cfg['name'], comp.cfg['version'], wall_time)
+                # state of component easyblock instance is not passed back from worker process,
+                # so use module requirements as determined in worker process
+                self.update_env_for_component(comp, reqs=reqs)
+                done.add(comp.cfg['name'])
+            else:
+                errors.append("installation of component %s failed: %s" % (comp.cfg['name'], err))
+
+        if errors:
+            raise EasyBuildError("Failed to install component(s): %s", '; '.join(errors))
+
+    def install_step(self):
+        """Install components, if specified."""
+        comp_cnt = len(self.cfg['components'])
+
+        # determine source spec for each source file name only once (first match wins)
+        src_specs = {}
+        for src in self.src:
+            src_specs.setdefault(src['name'], src)
+
+        max_workers = min(self.cfg['parallel_components'] or 1, comp_cnt)
+        if max_workers > 1 and not self.dry_run:
+            comps = [self.prepare_component(cfg, src_specs) for cfg in self.comp_cfgs]
+
+            # share available cores across components being installed concurrently
+            for comp in comps:
+                comp.cfg['parallel'] = max(1, comp.cfg['parallel'] // max_workers)
+
+            self.install_components_concurrently(comps, max_workers)
+        else:
+            for idx, cfg in enumerate(self.comp_cfgs):
+
+                print_msg("installing bundle component %s v%s (%d/%d)..." %
+                          (cfg['name'], cfg['version'], idx + 1, comp_cnt))
+                self.log.info("Installing component %s v%s using easyblock %s",
+                              cfg['name'], cfg['version'], cfg.easyblock)
+
+                comp = self.prepare_component(cfg, src_specs)
+                wall_time = self.install_component(comp)
+                self.log.info("Installation of component %s v%s took %.1f seconds",
+                              cfg['name'], cfg['version'], wall_time)
+
+                self.update_env_for_component(comp)
 
     def make_module_extra(self, *args, **kwargs):
         """Set extra stuff in module file, e.g. $EBROOT*, $EBVERSION*, etc."""
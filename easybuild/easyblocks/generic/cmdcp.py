@@ -28,6 +28,7 @@
 """
 import os
 import re
+from multiprocessing.pool import ThreadPool
 
 from easybuild.easyblocks.generic.makecp import MakeCp
 from easybuild.framework.easyconfig import CUSTOM
@@ -54,12 +55,27 @@ class CmdCp(MakeCp):
         return extra_vars
 
     def build_step(self):
-        """Build by running the command with the inputfiles"""
+        """
+        Build by running the command with the inputfiles
+
+        Commands are run concurrently (up to 'parallel' at a time); as soon as a command fails,
+        no other commands are started anymore, but commands that are already running can not be interrupted,
+        so those still run to completion before the error is reported.
+        """
         try:
             os.chdir(self.cfg['start_dir'])
         except OSError as err:
             raise EasyBuildError("Failed to move (back) to %s: %s", self.cfg['start_dir'], err)
 
+        # compile regular expressions only once, rather than once for every source file
+        cmds_map = []
+        for pattern, regex_cmd in self.cfg['cmds_map']:
+            try:
+                cmds_map.append((re.compile(pattern), regex_cmd))
+            except re.error as err:
+                raise EasyBuildError("Failed to compile regular expression '%s': %s", pattern, err)
+
+        cmds = []
         for src in self.src:
             src = src['path']
             target, _ = os.path.splitext(os.path.basename(src))
@@ -67,17 +83,34 @@ class CmdCp(MakeCp):
             # determine command to use
             # find (first) regex match, then complete matching command template
             cmd = None
-            for pattern, regex_cmd in self.cfg['cmds_map']:
-                try:
-                    regex = re.compile(pattern)
-                except re.error as err:
-                    raise EasyBuildError("Failed to compile regular expression '%s': %s", pattern, err)
-
+            for regex, regex_cmd in cmds_map:
                 if regex.match(os.path.basename(src)):
                     cmd = regex_cmd % {'source': src, 'target': target}
                     break
             if cmd is None:
                 raise EasyBuildError("No match for %s in %s, don't know which command to use.",
                                      src, self.cfg['cmds_map'])
+            cmds.append(cmd)
+
+        # commands for different sources are independent, so they can be run concurrently;
+        # stick to running them one by one in dry run mode, to keep the output readable
+        max_workers = min(self.cfg['parallel'] or 1, len(cmds))
+        if self.dry_run or max_workers <= 1:
+            for cmd in cmds:
+                run_cmd(cmd, log_all=True, simple=True)
+        else:
+            self.log.info("Running %d commands using %d workers", len(cmds), max_workers)
+            pool = ThreadPool(max_workers)
+            try:
+                # exhaust iterator, so first failing command results in an error being raised
+                for _ in pool.imap_unordered(self._run_cmd, cmds):
+                    pass
+            finally:
+                # don't start any remaining commands after a failure,
+                # (only) wait for commands that are already running to finish
+                pool.terminate()
+                pool.join()
 
-            run_cmd(cmd, log_all=True, simple=True)
+    def _run_cmd(self, cmd):
+        """Run specified command, fail if it exits with a non-zero exit code (output is logged by run_cmd)."""
+        return run_cmd(cmd, log_all=True, simple=True)
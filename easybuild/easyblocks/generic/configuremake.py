@@ -42,9 +42,13 @@ from datetime import datetime
 
 from easybuild.base import fancylogger
 from easybuild.easyblocks import VERSION as EASYBLOCKS_VERSION
+from easybuild.easyblocks.utilities import AUTOMAKE_TEST_FAILURES, MonitoredStepsMixin
+from easybuild.easyblocks.utilities import monitor_steps_extra_options
+from easybuild.easyblocks.utilities import parse_automake_test_results, parse_automake_test_suite_logs
+from easybuild.easyblocks.utilities import run_with_test_log_watcher
 from easybuild.framework.easyblock import EasyBlock
 from easybuild.framework.easyconfig import CUSTOM
-from easybuild.tools.build_log import print_warning
+from easybuild.tools.build_log import EasyBuildError, print_warning
 from easybuild.tools.config import source_paths, build_option
 from easybuild.tools.filetools import CHECKSUM_TYPE_SHA256, adjust_permissions, compute_checksum, download_file
 from easybuild.tools.filetools import read_file, remove_file
@@ -164,7 +168,7 @@ def obtain_config_guess(download_source_path=None, search_source_paths=None):
     return config_guess_path
 
 
-class ConfigureMake(EasyBlock):
+class ConfigureMake(MonitoredStepsMixin, EasyBlock):
     """
     Support for building and installing applications with configure/make/make install
     """
@@ -184,9 +188,11 @@ class ConfigureMake(EasyBlock):
                                 "(determined by config.guess shipped with EasyBuild if None,"
                                 " False implies to leave it up to the configure script)", CUSTOM],
             'install_cmd': [DEFAULT_INSTALL_CMD, "Build command to use", CUSTOM],
+            'parallel_make_check': [False, "Run tests in parallel (using 'make -j' with value of 'parallel')", CUSTOM],
             'prefix_opt': [None, "Prefix command line option for configure script ('--prefix=' if None)", CUSTOM],
             'tar_config_opts': [False, "Override tar settings as determined by configure.", CUSTOM],
         })
+        extra_vars.update(monitor_steps_extra_options())
         return extra_vars
 
     def __init__(self, *args, **kwargs):
@@ -194,6 +200,7 @@ class ConfigureMake(EasyBlock):
         super(ConfigureMake, self).__init__(*args, **kwargs)
 
         self.config_guess = None
+        self.automake_test_results = None
 
     def obtain_config_guess(self, download_source_path=None, search_source_paths=None):
         """
@@ -338,11 +345,62 @@ class ConfigureMake(EasyBlock):
         """
 
         if self.cfg['runtest']:
-            cmd = "%s make %s %s" % (self.cfg['pretestopts'], self.cfg['runtest'], self.cfg['testopts'])
-            (out, _) = run_cmd(cmd, log_all=True, simple=False)
+            make_cmd = 'make'
+            if self.cfg['parallel_make_check'] and self.cfg['parallel']:
+                make_cmd += ' -j %s' % self.cfg['parallel']
+
+            cmd = "%s %s %s %s" % (self.cfg['pretestopts'], make_cmd, self.cfg['runtest'], self.cfg['testopts'])
+
+            # results and durations of individual tests are only reported when running tests in parallel,
+            # since scanning the build directory for test log files is not for free
+            test_times = {}
+
+            def run_tests():
+                """Run tests, without failing on a non-zero exit code (so test results can be reported first)."""
+                return run_cmd(cmd, log_all=False, log_ok=False, simple=False)
+
+            if self.cfg['parallel_make_check'] and not self.dry_run:
+                (out, ec) = run_with_test_log_watcher(run_tests, os.getcwd(), test_times)
+            else:
+                (out, ec) = run_tests()
+
+            if self.cfg['parallel_make_check'] and not self.dry_run:
+                self.report_test_results(os.getcwd(), test_times)
+
+            if ec:
+                raise EasyBuildError('cmd "%s" exited with exit code %s and output:\n%s', cmd, ec, out)
+            self.log.info('cmd "%s" exited with exit code %s and output:\n%s', cmd, ec, out)
 
             return out
 
+    def report_test_results(self, path, test_times, slowest=10):
+        """
+        Report results of individual tests reported by Automake test harness (if any) in build log:
+        all failing tests, and slowest tests (if durations are known).
+        """
+        for (test_suite_log, counts) in sorted(parse_automake_test_suite_logs(path).items()):
+            counts_txt = ', '.join('%s: %s' % (key, counts[key]) for key in sorted(counts))
+            self.log.info("Summary of test results in %s: %s", test_suite_log, counts_txt)
+
+        self.automake_test_results = parse_automake_test_results(path, test_times=test_times)
+        if self.automake_test_results:
+            result_counts = {}
+            for (_, result, _) in self.automake_test_results:
+                result_counts[result] = result_counts.get(result, 0) + 1
+            self.log.info("Results for %d tests: %s", len(self.automake_test_results),
+                          ', '.join('%s: %s' % (key, result_counts[key]) for key in sorted(result_counts)))
+
+            failed_tests = [(name, res) for (name, res, _) in self.automake_test_results
+                            if res in AUTOMAKE_TEST_FAILURES]
+            if failed_tests:
+                self.log.warning("Failing tests (%d): %s", len(failed_tests),
+                                 ', '.join('%s (%s)' % x for x in failed_tests))
+
+            timed_tests = sorted([x for x in self.automake_test_results if x[2] is not None], key=lambda x: -x[2])
+            if timed_tests:
+                self.log.info("Slowest tests: %s",
+                              ', '.join('%s (%s, %.1fs)' % x for x in timed_tests[:slowest]))
+
     def install_step(self):
         """
         Create the installation in correct location
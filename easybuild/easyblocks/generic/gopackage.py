@@ -34,10 +34,42 @@ import easybuild.tools.environment as env
 from easybuild.framework.easyblock import EasyBlock
 from easybuild.framework.easyconfig import CUSTOM
 from easybuild.tools.build_log import EasyBuildError
+from easybuild.tools.config import ConfigurationVariables
 from easybuild.tools.modules import get_software_root, get_software_version
 from easybuild.tools.run import run_cmd
 
 
+def get_go_cache_stats(path):
+    """
+    Determine number of files and total size (in bytes) of specified Go cache directory.
+    Returns (0, 0) if the directory does not exist (yet).
+    """
+    cnt, size = 0, 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            try:
+                size += os.lstat(os.path.join(dirpath, filename)).st_size
+                cnt += 1
+            except OSError:
+                pass
+    return cnt, size
+
+
+def get_go_cached_modules(modcache):
+    """
+    Determine set of Go modules (as <module path>@<version>) that are available in specified Go module cache.
+    """
+    res = set()
+    download_dir = os.path.join(modcache, 'cache', 'download')
+    for dirpath, _, filenames in os.walk(download_dir):
+        for filename in filenames:
+            # each downloaded module version is stored as <module path>/@v/<version>.zip
+            if filename.endswith('.zip') and os.path.basename(dirpath) == '@v':
+                modpath = os.path.relpath(os.path.dirname(dirpath), download_dir)
+                res.add('%s@%s' % (modpath, filename[:-len('.zip')]))
+    return res
+
+
 class GoPackage(EasyBlock):
     """Builds and installs a Go package, and provides a dedicated module file."""
 
@@ -49,9 +81,23 @@ class GoPackage(EasyBlock):
         extra_vars.update({
             'modulename': [None, "Module name of the Go package, when building non-native module", CUSTOM],
             'forced_deps': [None, "Force specific version of Go package, when building non-native module", CUSTOM],
+            'go_cache_dir': [None, "Directory for Go module cache ($GOMODCACHE) and build cache ($GOCACHE) "
+                                   "that is shared across installations (default: 'go-cache' subdirectory "
+                                   "of EasyBuild prefix); use False to not set up shared Go caches", CUSTOM],
+            'go_mod_proxy': [None, "Local directory with Go modules to use as module proxy ($GOPROXY), "
+                                   "for example a Go module cache populated on another system; "
+                                   "Go modules are then only obtained from there, without network access", CUSTOM],
         })
         return extra_vars
 
+    def __init__(self, *args, **kwargs):
+        """Initialize GoPackage-specific class variables."""
+        super(GoPackage, self).__init__(*args, **kwargs)
+
+        self.go_modcache = None
+        self.go_buildcache = None
+        self.go_cache_stats = None
+
     def prepare_step(self, *args, **kwargs):
         """Go-specific preparations."""
         super(GoPackage, self).prepare_step(*args, **kwargs)
@@ -70,10 +116,69 @@ class GoPackage(EasyBlock):
         # set bin folder
         env.setvar('GOBIN', os.path.join(self.installdir, 'bin'), verbose=False)
 
+        self.set_up_go_caches()
+
         # creates log entries for go being used, for debugging
         run_cmd("go version", verbose=False, trace=False)
         run_cmd("go env", verbose=False, trace=False)
 
+    def set_up_go_caches(self):
+        """
+        Set up Go module cache and build cache that are shared across installations,
+        and configure use of a local Go module proxy (if specified).
+        """
+        go_cache_dir = self.cfg['go_cache_dir']
+        if go_cache_dir is None:
+            go_cache_dir = os.path.join(ConfigurationVariables()['prefix'], 'go-cache')
+
+        if go_cache_dir:
+            self.go_modcache = os.path.join(go_cache_dir, 'pkg', 'mod')
+            self.go_buildcache = os.path.join(go_cache_dir, 'build')
+
+            # $GOMODCACHE is only supported by Go 1.15 and newer (older Go versions use $GOPATH/pkg/mod);
+            # $GOPATH is deliberately left untouched, since it's also used for other (installation-specific) files
+            env.setvar('GOMODCACHE', self.go_modcache)
+            env.setvar('GOCACHE', self.go_buildcache)
+
+            self.go_cache_stats = {
+                'modules': get_go_cached_modules(self.go_modcache),
+                'build': get_go_cache_stats(self.go_buildcache),
+            }
+        else:
+            self.log.info("Not using shared Go caches, since 'go_cache_dir' is set to %s", go_cache_dir)
+
+        go_mod_proxy = self.cfg['go_mod_proxy']
+        if go_mod_proxy:
+            go_mod_proxy = os.path.abspath(go_mod_proxy)
+            # a Go module cache can be used directly as module proxy via its 'cache/download' subdirectory
+            for subdir in [os.path.join('pkg', 'mod', 'cache', 'download'), os.path.join('cache', 'download')]:
+                if os.path.isdir(os.path.join(go_mod_proxy, subdir)):
+                    go_mod_proxy = os.path.join(go_mod_proxy, subdir)
+                    break
+
+            if not os.path.isdir(go_mod_proxy):
+                raise EasyBuildError("Specified Go module proxy directory %s does not exist", go_mod_proxy)
+
+            # only use local module proxy, no fallback to downloading modules directly;
+            # checksum database can not be consulted without network access, but go.sum is still verified
+            env.setvar('GOPROXY', 'file://%s' % go_mod_proxy)
+            env.setvar('GOSUMDB', 'off')
+            self.log.info("Using Go modules from local module proxy %s", go_mod_proxy)
+
+    def log_go_cache_stats(self):
+        """Log statistics on reuse of shared Go caches."""
+        if self.go_cache_stats:
+            modules_before = self.go_cache_stats['modules']
+            modules_after = get_go_cached_modules(self.go_modcache)
+            new_modules = sorted(modules_after - modules_before)
+            self.log.info("Go module cache %s: %d modules were already available, %d modules were added: %s",
+                          self.go_modcache, len(modules_before), len(new_modules), ', '.join(new_modules))
+
+            cnt_before, size_before = self.go_cache_stats['build']
+            cnt_after, size_after = get_go_cache_stats(self.go_buildcache)
+            self.log.info("Go build cache %s: %d files (%d bytes) before, %d files (%d bytes) after installation",
+                          self.go_buildcache, cnt_before, size_before, cnt_after, size_after)
+
     def build_step(self):
         """If Go package is not native go module, lets try to make the module."""
 
@@ -135,6 +240,8 @@ class GoPackage(EasyBlock):
         ])
         run_cmd(cmd, log_all=True, log_ok=True, simple=True)
 
+        self.log_go_cache_stats()
+
     def sanity_check_step(self):
         """Custom sanity check for Go package."""
 
@@ -29,11 +29,12 @@ EasyBuild support for building and installing Octave, implemented as an easybloc
 @author: Kenneth Hoste (Ghent University)
 """
 import os
+import re
 import tempfile
 
 from easybuild.framework.extensioneasyblock import ExtensionEasyBlock
 from easybuild.tools.build_log import EasyBuildError
-from easybuild.tools.filetools import change_dir
+from easybuild.tools.filetools import change_dir, write_file
 from easybuild.tools.run import run_cmd
 
 
@@ -44,6 +45,76 @@ class OctavePackage(ExtensionEasyBlock):
         """Raise error when configure step is run: installing Octave toolboxes stand-alone is not supported (yet)"""
         raise EasyBuildError("Installing Octave toolboxes stand-alone is not supported (yet)")
 
+    def get_pkg_prefix_cmd(self):
+        """Determine Octave command to specify installation prefixes for Octave packages."""
+        # need to specify two install locations, to avoid that $HOME/octave is abused;
+        # one general package installation prefix, one for architecture-dependent files
+        pkg_prefix = os.path.join(self.installdir, 'share', 'octave', 'packages')
+        pkg_arch_dep_prefix = pkg_prefix + '-arch-dep'
+        return "pkg prefix %s %s; " % (pkg_prefix, pkg_arch_dep_prefix)
+
+    def is_last_in_batch(self):
+        """
+        Check whether the batch of Octave packages should be installed after adding this Octave package to it,
+        which is the case if this is the last extension, or if the next extension is not an Octave package
+        (since that would not install the pending batch first, which would break the installation order).
+        """
+        exts = getattr(self.master, 'ext_instances', [])
+        idx = [i for i, ext in enumerate(exts) if ext is self]
+        return not idx or idx[0] + 1 >= len(exts) or not isinstance(exts[idx[0] + 1], OctavePackage)
+
+    def install_batch(self):
+        """
+        Install batch of Octave packages using a single Octave session, in order;
+        result of installing each Octave package is checked separately, so all failing packages are reported.
+        """
+        batch = getattr(self.master, 'octave_pkgs_batch', None)
+        self.master.octave_pkgs_batch = None
+        if not batch:
+            return
+
+        pkg_names = [x[0] for x in batch]
+
+        def quote(txt):
+            """Quote string for use in Octave script."""
+            return "'%s'" % txt.replace("'", "''")
+
+        octave_script = '\n'.join([
+            self.get_pkg_prefix_cmd(),
+            'pkgs = {%s};' % ', '.join(quote(x[1]) for x in batch),
+            'names = {%s};' % ', '.join(quote(x) for x in pkg_names),
+            'for i = 1:numel(pkgs)',
+            '  try',
+            "    pkg('install', '-global', pkgs{i});",
+            "    printf('EB_BATCH_RESULT %s OK\\n', names{i});",
+            '  catch err',
+            "    printf('EB_BATCH_RESULT %s FAILED %s\\n', names{i}, strrep(err.message, \"\\n\", ' '));",
+            '  end',
+            'end',
+            '',
+        ])
+        script_dir = tempfile.mkdtemp(prefix='octave-batch-', dir=self.master.builddir)
+        script = os.path.join(script_dir, 'install_octave_pkgs.m')
+        write_file(script, octave_script)
+
+        self.log.info("Installing batch of %d Octave packages: %s", len(pkg_names), ', '.join(pkg_names))
+        (out, _) = run_cmd("octave -q %s" % script, log_all=False, log_ok=False, simple=False)
+
+        results = dict((name, (status, msg.strip())) for (name, status, msg) in
+                       re.findall(r'^EB_BATCH_RESULT (\S+) (OK|FAILED)(.*)$', out, re.M))
+        failed = []
+        for pkg_name in pkg_names:
+            status, msg = results.get(pkg_name, ('FAILED', "(no result reported)"))
+            if status == 'OK':
+                self.log.info("Octave package %s installed successfully", pkg_name)
+            else:
+                self.log.warning("Installation of Octave package %s failed: %s", pkg_name, msg)
+                failed.append(pkg_name)
+
+        if failed:
+            raise EasyBuildError("Errors detected during installation of Octave packages %s! Output of Octave:\n%s",
+                                 ', '.join(failed), out)
+
     def run(self):
         """Perform Octave package installation (as extension)."""
 
@@ -53,20 +124,30 @@ class OctavePackage(ExtensionEasyBlock):
             # call out to ExtensionEasyBlock to unpack & apply patches
             super(OctavePackage, self).run(unpack_src=True)
 
-            # create temporary tarball from unpacked & patched source
-            src = os.path.join(tempfile.gettempdir(), '%s-%s-patched.tar.gz' % (self.name, self.version))
+            # create temporary (uncompressed) tarball from unpacked & patched source,
+            # in a unique location to avoid clashes with concurrent installations
+            tmpdir = tempfile.mkdtemp(prefix='%s-%s-' % (self.name, self.version), dir=self.builddir)
+            src = os.path.join(tmpdir, '%s-%s-patched.tar' % (self.name, self.version))
             cwd = change_dir(os.path.dirname(self.ext_dir))
-            run_cmd("tar cfvz %s %s" % (src, os.path.basename(self.ext_dir)))
+            run_cmd("tar cf %s %s" % (src, os.path.basename(self.ext_dir)))
             change_dir(cwd)
         else:
             src = self.src
 
-        # need to specify two install locations, to avoid that $HOME/octave is abused;
-        # one general package installation prefix, one for architecture-dependent files
-        pkg_prefix = os.path.join(self.installdir, 'share', 'octave', 'packages')
-        pkg_arch_dep_prefix = pkg_prefix + '-arch-dep'
-        octave_cmd = "pkg prefix %s %s; " % (pkg_prefix, pkg_arch_dep_prefix)
+        # Octave packages installed with the generic OctavePackage easyblock can be installed in batch
+        if self.cfg.get('batch_install') and self.__class__ is OctavePackage and not self.dry_run:
+            if getattr(self.master, 'octave_pkgs_batch', None) is None:
+                self.master.octave_pkgs_batch = []
+            self.log.info("Adding Octave package %s to batch of Octave packages to install", self.name)
+            self.master.octave_pkgs_batch.append((self.name, src))
+            if self.is_last_in_batch():
+                self.install_batch()
+            return
+
+        # install pending batch of Octave packages first, to retain installation order
+        self.install_batch()
 
+        octave_cmd = self.get_pkg_prefix_cmd()
         octave_cmd += "pkg install -global %s" % src
 
         run_cmd("octave --eval '%s'" % octave_cmd)
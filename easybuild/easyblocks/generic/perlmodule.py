@@ -30,7 +30,8 @@ EasyBuild support for Perl module, implemented as an easyblock
 """
 import os
 
-from easybuild.easyblocks.perl import EXTS_FILTER_PERL_MODULES, get_major_perl_version, get_site_suffix
+from easybuild.easyblocks.perl import EXTS_FILTER_PERL_MODULES, get_major_perl_version, get_perl_module_locations
+from easybuild.easyblocks.perl import get_site_suffix
 from easybuild.framework.easyconfig import CUSTOM
 from easybuild.framework.extensioneasyblock import ExtensionEasyBlock
 from easybuild.easyblocks.generic.configuremake import ConfigureMake
@@ -47,6 +48,8 @@ class PerlModule(ExtensionEasyBlock, ConfigureMake):
         """Easyconfig parameters specific to Perl modules."""
         extra_vars = {
             'runtest': ['test', "Run unit tests.", CUSTOM],  # overrides default
+            'parallel_make_check': [False, "Run unit tests in parallel, using $HARNESS_OPTIONS "
+                                           "(based on 'parallel')", CUSTOM],
         }
         return ExtensionEasyBlock.extra_options(extra_vars)
 
@@ -59,6 +62,21 @@ class PerlModule(ExtensionEasyBlock, ConfigureMake):
         # Therefore it is better to unset these variables.
         unset_env_vars(['PERL_MM_OPT', 'PERL_MB_OPT'])
 
+    def harness_env(self):
+        """
+        Determine environment variable setting to run tests in parallel via TAP::Harness,
+        which is used by both 'make test' (ExtUtils::MakeMaker) and 'perl Build test' (Module::Build).
+        """
+        res = ''
+        if self.cfg['parallel_make_check'] and self.cfg['parallel'] and self.cfg['parallel'] > 1:
+            # don't override $HARNESS_OPTIONS if it is already set
+            if os.getenv('HARNESS_OPTIONS'):
+                self.log.info("Not running tests in parallel, $HARNESS_OPTIONS is already set: %s",
+                              os.getenv('HARNESS_OPTIONS'))
+            else:
+                res = 'HARNESS_OPTIONS=j%s' % self.cfg['parallel']
+        return res
+
     def install_perl_module(self):
         """Install procedure for Perl modules: using either Makefile.Pl or Build.PL."""
 
@@ -75,7 +93,18 @@ class PerlModule(ExtensionEasyBlock, ConfigureMake):
             run_cmd(install_cmd)
 
             ConfigureMake.build_step(self)
-            ConfigureMake.test_step(self)
+
+            harness_env = self.harness_env()
+            if harness_env:
+                pretestopts = self.cfg['pretestopts']
+                self.cfg['pretestopts'] = 'export %s && %s' % (harness_env, pretestopts)
+                try:
+                    ConfigureMake.test_step(self)
+                finally:
+                    self.cfg['pretestopts'] = pretestopts
+            else:
+                ConfigureMake.test_step(self)
+
             ConfigureMake.install_step(self)
 
         elif os.path.exists('Build.PL'):
@@ -92,7 +121,7 @@ class PerlModule(ExtensionEasyBlock, ConfigureMake):
             run_cmd("%s perl Build build %s" % (self.cfg['prebuildopts'], self.cfg['buildopts']))
 
             if self.cfg['runtest']:
-                run_cmd('perl Build %s' % self.cfg['runtest'])
+                run_cmd('%s perl Build %s' % (self.harness_env(), self.cfg['runtest']))
             run_cmd('%s perl Build install %s' % (self.cfg['preinstallopts'], self.cfg['installopts']))
 
     def run(self):
@@ -125,8 +154,53 @@ class PerlModule(ExtensionEasyBlock, ConfigureMake):
         """
         Custom sanity check for Perl modules
         """
+        if self.is_extension and not args and not kwargs:
+            exts_filter = self.cfg.get_ref('exts_filter')
+            if exts_filter is None or tuple(exts_filter) == EXTS_FILTER_PERL_MODULES:
+                res = self.batched_sanity_check()
+                if res is not None:
+                    return res
+
         return ExtensionEasyBlock.sanity_check_step(self, EXTS_FILTER_PERL_MODULES, *args, **kwargs)
 
+    def batched_sanity_check(self):
+        """
+        Check whether this Perl module is available, using results obtained for all Perl modules installed
+        as extensions by the same parent installation with a single 'perl' command,
+        rather than running 'perldoc -lm' for each Perl module separately.
+
+        Returns None if no result is available for this Perl module.
+        """
+        modname = self.options.get('modulename', self.name)
+        if modname is False:
+            return None
+
+        locations = getattr(self.master, 'perl_module_locations', None)
+        if locations is None:
+            modnames = []
+            for ext in getattr(self.master, 'ext_instances', []):
+                if isinstance(ext, PerlModule):
+                    ext_modname = ext.options.get('modulename', ext.name)
+                    if ext_modname is not False:
+                        modnames.append(ext_modname)
+
+            self.log.info("Checking availability of %d Perl modules in one go", len(modnames))
+            locations = get_perl_module_locations(modnames)
+            self.master.perl_module_locations = locations
+
+        if modname not in locations:
+            return None
+        elif locations[modname]:
+            self.log.info("Perl module %s found at %s", modname, locations[modname])
+            res = (True, '')
+        else:
+            fail_msg = "Perl module %s not found in @INC" % modname
+            self.log.warning("Sanity check for '%s' extension failed: %s", self.name, fail_msg)
+            self.sanity_check_fail_msgs.append(fail_msg)
+            res = (False, fail_msg)
+
+        return res
+
     def make_module_req_guess(self):
         """Customized dictionary of paths to look for with PERL*LIB."""
         majver = get_major_perl_version()
@@ -41,6 +41,7 @@ from distutils.sysconfig import get_config_vars
 import easybuild.tools.environment as env
 from easybuild.base import fancylogger
 from easybuild.easyblocks.python import EBPYTHONPREFIXES, EXTS_FILTER_PYTHON_PACKAGES
+from easybuild.easyblocks.utilities import MonitoredStepsMixin, monitor_steps_extra_options
 from easybuild.framework.easyconfig import CUSTOM
 from easybuild.framework.extensioneasyblock import ExtensionEasyBlock
 from easybuild.tools.build_log import EasyBuildError, print_msg
@@ -62,6 +63,12 @@ SETUP_PY_INSTALL_CMD = "%(python)s setup.py %(install_target)s --prefix=%(prefix
 SETUP_PY_DEVELOP_CMD = "%(python)s setup.py develop --prefix=%(prefix)s %(installopts)s"
 UNKNOWN = 'UNKNOWN'
 
+# patterns for lines in output of build/install commands that indicate that dependencies were downloaded
+DOWNLOAD_DEP_PATTERNS = [
+    'Downloading .*/packages/.*',  # setuptools
+    r'Collecting .* \(from.*',  # pip
+]
+
 
 def det_python_version(python_cmd):
     """Determine version of specified 'python' command."""
@@ -222,9 +229,12 @@ def det_pip_version():
     return pip_version
 
 
-class PythonPackage(ExtensionEasyBlock):
+class PythonPackage(MonitoredStepsMixin, ExtensionEasyBlock):
     """Builds and installs a Python package, and provides a dedicated module file."""
 
+    # patterns for lines in output of build/install commands that are reported in the log
+    install_output_patterns = DOWNLOAD_DEP_PATTERNS
+
     @staticmethod
     def extra_options(extra_vars=None):
         """Easyconfig parameters specific to Python packages."""
@@ -252,6 +262,7 @@ class PythonPackage(ExtensionEasyBlock):
             'use_setup_py_develop': [False, "Install using '%s' (deprecated)" % SETUP_PY_DEVELOP_CMD, CUSTOM],
             'zipped_egg': [False, "Install as a zipped eggs (requires use_easy_install)", CUSTOM],
         })
+        extra_vars.update(monitor_steps_extra_options())
         return ExtensionEasyBlock.extra_options(extra_vars=extra_vars)
 
     def __init__(self, *args, **kwargs):
@@ -567,12 +578,9 @@ class PythonPackage(ExtensionEasyBlock):
 
             cmd = ' '.join([self.cfg['prebuildopts'], self.python_cmd, 'setup.py', self.cfg['buildcmd'],
                             self.cfg['buildopts']])
-            (out, _) = run_cmd(cmd, log_all=True, log_ok=True, simple=False)
-
             # keep track of all output, so we can check for auto-downloaded dependencies;
-            # take into account that build/install steps may be run multiple times
-            # We consider the build and install output together as downloads likely happen here if this is run
-            self.install_cmd_output += out
+            # we consider the build and install output together as downloads likely happen here if this is run
+            self.run_install_cmd(cmd)
 
     def test_step(self):
         """Test the built Python package."""
@@ -611,6 +619,28 @@ class PythonPackage(ExtensionEasyBlock):
             if testinstalldir:
                 remove_dir(testinstalldir)
 
+    def run_install_cmd(self, cmd):
+        """
+        Run build/install command, and keep track of its output in install_cmd_output (so it can be checked for
+        auto-downloaded dependencies). Once the command has completed, its output is scanned line by line,
+        and lines that match one of the patterns in install_output_patterns are logged.
+
+        :return: output of command
+        """
+        (out, _) = run_cmd(cmd, log_all=True, log_ok=True, simple=False)
+
+        # take into account that build/install commands may be run multiple times
+        # (for iterated installations over multiply Python versions)
+        self.install_cmd_output += out
+
+        if not self.dry_run:
+            regexes = [re.compile(pattern) for pattern in self.install_output_patterns]
+            for line in out.splitlines():
+                if any(regex.search(line) for regex in regexes):
+                    self.log.info("Relevant line in output of cmd \"%s\": %s", cmd, line)
+
+        return out
+
     def install_step(self):
         """Install Python package to a custom path using setup.py"""
 
@@ -632,12 +662,9 @@ class PythonPackage(ExtensionEasyBlock):
 
         # actually install Python package
         cmd = self.compose_install_command(self.installdir)
-        (out, _) = run_cmd(cmd, log_all=True, log_ok=True, simple=False)
 
-        # keep track of all output from install command, so we can check for auto-downloaded dependencies;
-        # take into account that install step may be run multiple times
-        # (for iterated installations over multiply Python versions)
-        self.install_cmd_output += out
+        # keep track of all output from install command, so we can check for auto-downloaded dependencies
+        self.run_install_cmd(cmd)
 
         # restore env vars if it they were set
         for name in ('PYTHONPATH', 'PATH'):
@@ -706,12 +733,8 @@ class PythonPackage(ExtensionEasyBlock):
 
         if self.cfg.get('download_dep_fail', False):
             self.log.info("Detection of downloaded depenencies enabled, checking output of installation command...")
-            patterns = [
-                'Downloading .*/packages/.*',  # setuptools
-                r'Collecting .* \(from.*',  # pip
-            ]
             downloaded_deps = []
-            for pattern in patterns:
+            for pattern in DOWNLOAD_DEP_PATTERNS:
                 downloaded_deps.extend(re.compile(pattern, re.M).findall(self.install_cmd_output))
 
             if downloaded_deps:
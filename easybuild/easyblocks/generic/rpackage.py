@@ -33,13 +33,16 @@ EasyBuild support for building and installing R packages, implemented as an easy
 @author: Balazs Hajgato (Vrije Universiteit Brussel)
 """
 import os
+import re
+import tarfile
+import tempfile
 
-from easybuild.easyblocks.r import EXTS_FILTER_R_PACKAGES, EB_R
+from easybuild.easyblocks.r import EXTS_FILTER_R_PACKAGES, EB_R, get_r_pkgs_load_results
 from easybuild.easyblocks.generic.configuremake import check_config_guess, obtain_config_guess
 from easybuild.framework.easyconfig import CUSTOM
 from easybuild.framework.extensioneasyblock import ExtensionEasyBlock
 from easybuild.tools.build_log import EasyBuildError
-from easybuild.tools.filetools import mkdir, copy_file
+from easybuild.tools.filetools import mkdir, copy_file, read_file, symlink
 from easybuild.tools.run import run_cmd, parse_log_for_error
 
 
@@ -62,6 +65,36 @@ def make_R_install_option(opt, values, cmdline=False):
     return txt
 
 
+def get_r_pkg_description(path):
+    """
+    Obtain package name and version from DESCRIPTION file included in specified R package source tarball.
+
+    :param path: path to R package source tarball
+    :return: (name, version) tuple, or (None, None) if no DESCRIPTION file was found
+    """
+    name, version = None, None
+    try:
+        tar = tarfile.open(path)
+        try:
+            for member in tar:
+                # DESCRIPTION file is located in top-level directory of R package source tarball
+                if member.isfile() and re.match(r'^[^/]+/DESCRIPTION$', member.name):
+                    txt = tar.extractfile(member).read().decode('utf-8', 'replace')
+                    res = re.search(r'^Package:\s*(\S+)', txt, re.M)
+                    if res:
+                        name = res.group(1)
+                    res = re.search(r'^Version:\s*(\S+)', txt, re.M)
+                    if res:
+                        version = res.group(1)
+                    break
+        finally:
+            tar.close()
+    except (IOError, OSError, tarfile.TarError):
+        pass
+
+    return name, version
+
+
 class RPackage(ExtensionEasyBlock):
     """
     Install an R package as a separate module, or as an extension.
@@ -74,6 +107,8 @@ class RPackage(ExtensionEasyBlock):
         extra_vars.update({
             'exts_subdir': ['', "Subdirectory where R extensions should be installed info", CUSTOM],
             'unpack_sources': [False, "Unpack sources before installation", CUSTOM],
+            'batch_install': [False, "Install R packages that are installed as extensions in batches, "
+                                     "using a single R session per batch (in parallel, based on 'parallel')", CUSTOM],
         })
         return extra_vars
 
@@ -178,7 +213,8 @@ class RPackage(ExtensionEasyBlock):
             self.log.debug("R package %s installed succesfully" % self.name)
 
     def update_config_guess(self, path):
-        """Update any config.guess found in specified directory"""
+        """Update any config.guess found in specified directory, return list of updated config.guess files"""
+        updated = []
         for config_guess_dir in (root for root, _, files in os.walk(path) if 'config.guess' in files):
             config_guess = os.path.join(config_guess_dir, 'config.guess')
             if not check_config_guess(config_guess):
@@ -186,8 +222,10 @@ class RPackage(ExtensionEasyBlock):
                 if updated_config_guess:
                     self.log.debug("Replacing outdated %s with more recent %s", config_guess, updated_config_guess)
                     copy_file(updated_config_guess, config_guess)
+                    updated.append(config_guess)
                 else:
                     raise EasyBuildError("Failed to obtain updated config.guess")
+        return updated
 
     def install_step(self):
         """Install procedure for R packages."""
@@ -197,27 +235,179 @@ class RPackage(ExtensionEasyBlock):
         cmd, stdin = self.make_cmdline_cmd(prefix=os.path.join(self.installdir, self.cfg['exts_subdir']))
         self.install_R_package(cmd, inp=stdin)
 
-    def run(self):
-        """Install R package as an extension."""
-
-        # determine location
+    def get_lib_install_prefix(self):
+        """Determine location where R package should be installed as an extension."""
         if isinstance(self.master, EB_R):
             # extension is being installed as part of an R installation/module
-            (out, _) = run_cmd("R RHOME", log_all=True, simple=False)
-            rhome = out.strip()
-            lib_install_prefix = os.path.join(rhome, 'library')
+            lib_install_prefix = os.path.join(self.master.get_r_home(), 'library')
         else:
             # extension is being installed in a separate installation prefix
             lib_install_prefix = os.path.join(self.installdir, self.cfg['exts_subdir'])
             mkdir(lib_install_prefix, parents=True)
 
+        return lib_install_prefix
+
+    def get_batch_key(self, lib_install_prefix):
+        """
+        Determine key for batch of R packages this R package can be installed with, when batch installation is enabled.
+        R packages can only be installed together if they are installed in the same location with the same options.
+
+        Returns None if this R package can not be installed as part of a batch.
+        """
+        res = None
+        # only R packages installed with the generic RPackage easyblock can be installed in batch,
+        # since easyblocks that derive from RPackage typically customize the installation procedure;
+        # only a single source tarball that does not need to be patched or unpacked is supported
+        if self.cfg['batch_install'] and self.__class__ is RPackage and not self.dry_run:
+            if self.patches or self.options.get('start_dir'):
+                self.log.info("Not installing R package %s in batch: patched or unpacked source required", self.name)
+            elif self.configurevars or self.configureargs:
+                self.log.info("Not installing R package %s in batch: custom configure options required", self.name)
+            elif not self.src.endswith('.tar.gz'):
+                self.log.info("Not installing R package %s in batch: source is not a .tar.gz file", self.name)
+            else:
+                res = (lib_install_prefix, self.cfg['preinstallopts'], self.cfg['installopts'])
+
+        return res
+
+    def add_to_batch(self, batch_key):
+        """
+        Add this R package to the batch of R packages that will be installed together.
+        Returns False if this R package can not be added to a batch.
+        """
+        pkg_name, pkg_version = get_r_pkg_description(self.src)
+        if pkg_name is None or pkg_version is None:
+            self.log.info("Not installing R package %s in batch: name/version not found in %s", self.name, self.src)
+            return False
+
+        batch = getattr(self.master, 'r_pkgs_batch', None)
+        if batch and batch['key'] != batch_key:
+            self.install_batch()
+            batch = None
+
+        if not batch:
+            batch = {'key': batch_key, 'pkgs': []}
+            self.master.r_pkgs_batch = batch
+
+        self.log.info("Adding R package %s (%s v%s) to batch of R packages to install",
+                      self.name, pkg_name, pkg_version)
+        batch['pkgs'].append((pkg_name, pkg_version, self.src))
+
+        return True
+
+    def install_batch(self):
+        """
+        Install batch of R packages using a single R session, via install.packages with 'Ncpus' set,
+        which takes into account dependencies between the R packages in the batch.
+        Each R package is checked separately after installation, so all failing R packages are reported.
+        """
+        batch = getattr(self.master, 'r_pkgs_batch', None)
+        self.master.r_pkgs_batch = None
+        if not batch:
+            return
+
+        lib_install_prefix, preinstallopts, installopts = batch['key']
+        pkgs = batch['pkgs']
+        pkg_names = [x[0] for x in pkgs]
+
+        # create local CRAN-like repository with source tarballs for R packages in this batch,
+        # with file names as expected by install.packages
+        repo_dir = tempfile.mkdtemp(prefix='R-batch-', dir=self.master.builddir)
+        outputs_dir = os.path.join(repo_dir, 'outputs')
+        mkdir(outputs_dir)
+        for pkg_name, pkg_version, src in pkgs:
+            symlink(src, os.path.join(repo_dir, '%s_%s.tar.gz' % (pkg_name, pkg_version)), use_abspath_source=True)
+
+        ncpus = self.cfg['parallel'] or 1
+        install_opts = ''
+        if installopts:
+            install_opts = ', INSTALL_opts="%s"' % installopts.replace('"', '\\"')
+
+        r_cmd = '\n'.join([
+            'tools::write_PACKAGES("%s", type="source")' % repo_dir,
+            'pkgs <- c(%s)' % ', '.join('"%s"' % x for x in pkg_names),
+            'versions <- c(%s)' % ', '.join('"%s"' % x[1] for x in pkgs),
+            # keep track of warnings reported by install.packages for R packages that failed to install
+            'install_warnings <- c()',
+            'start_time <- Sys.time() - 1',
+            'withCallingHandlers(',
+            '    tryCatch(install.packages(pkgs, lib="%s", contriburl="file://%s", type="source", dependencies=FALSE, '
+            'Ncpus=%d, keep_outputs="%s"%s), error=function(e) cat("ERROR:", conditionMessage(e), "\\n")),' % (
+                lib_install_prefix, repo_dir, ncpus, outputs_dir, install_opts),
+            '    warning=function(w) install_warnings <<- c(install_warnings, conditionMessage(w)))',
+            # an R package is only considered to be installed correctly if install.packages did not report
+            # a non-zero exit status for it, and if the expected version was (re)installed by this R session
+            # (a version that was already installed before does not count)
+            'for (i in seq_along(pkgs)) {',
+            '    failed <- any(grepl(paste0("package .", pkgs[i], ". had non-zero exit status"), install_warnings))',
+            '    descfile <- file.path("%s", pkgs[i], "DESCRIPTION")' % lib_install_prefix,
+            '    version <- suppressWarnings(packageDescription(pkgs[i], lib.loc="%s", fields="Version"))' %
+            lib_install_prefix,
+            '    ok <- !failed && !is.na(version) && version == versions[i] && file.mtime(descfile) >= start_time',
+            '    cat("EB_BATCH_RESULT", pkgs[i], if (isTRUE(ok)) "OK" else "FAILED", "\\n")',
+            '}',
+        ])
+        cmd = "%s R -q --no-save" % preinstallopts
+
+        self.log.info("Installing batch of %d R packages using %d cores: %s", len(pkgs), ncpus, ', '.join(pkg_names))
+        out, _ = run_cmd(cmd, log_all=False, log_ok=False, simple=False, inp=r_cmd, regexp=False)
+
+        results = dict(re.findall(r'^EB_BATCH_RESULT (\S+) (OK|FAILED)', out, re.M))
+        failed = [x for x in pkg_names if results.get(x) != 'OK']
+        for pkg_name in pkg_names:
+            if pkg_name not in failed:
+                self.log.info("R package %s installed successfully", pkg_name)
+
+        if failed:
+            for pkg_name in failed:
+                outfile = os.path.join(outputs_dir, '%s.out' % pkg_name)
+                if os.path.exists(outfile):
+                    pkg_out = '\n'.join(read_file(outfile).splitlines()[-50:])
+                else:
+                    pkg_out = "(no output available)"
+                self.log.warning("Installation of R package %s failed, last part of output:\n%s", pkg_name, pkg_out)
+            raise EasyBuildError("Errors detected during installation of R packages %s! Output of R command:\n%s",
+                                 ', '.join(failed), out)
+
+    def is_last_in_batch(self):
+        """
+        Check whether the batch of R packages should be installed after adding this R package to it,
+        which is the case if this is the last extension, or if the next extension is not an R package
+        (since that would not install the pending batch first, which would break the installation order).
+        """
+        exts = getattr(self.master, 'ext_instances', [])
+        idx = [i for i, ext in enumerate(exts) if ext is self]
+        return not idx or idx[0] + 1 >= len(exts) or not isinstance(exts[idx[0] + 1], RPackage)
+
+    def run(self):
+        """Install R package as an extension."""
+
+        # determine location
+        lib_install_prefix = self.get_lib_install_prefix()
+
         if self.src:
             super(RPackage, self).run(unpack_src=True)
             self.ext_src = self.src
-            self.update_config_guess(self.ext_dir)
+
+            # R packages for which config.guess had to be updated can not be installed from source tarball in batch
+            if self.update_config_guess(self.ext_dir):
+                batch_key = None
+            else:
+                batch_key = self.get_batch_key(lib_install_prefix)
+
+            if batch_key and self.add_to_batch(batch_key):
+                if self.is_last_in_batch():
+                    self.install_batch()
+                return
+
+            # install pending batch of R packages first, to retain installation order
+            self.install_batch()
+
             self.log.debug("Installing R package %s version %s." % (self.name, self.version))
             cmd, stdin = self.make_cmdline_cmd(prefix=lib_install_prefix)
         else:
+            self.install_batch()
+
             if self.patches:
                 raise EasyBuildError("Cannot patch R package %s as no explicit source is given!", self.name)
             self.log.debug("Installing most recent version of R package %s (source not found)." % self.name)
@@ -229,8 +419,59 @@ class RPackage(ExtensionEasyBlock):
         """
         Custom sanity check for R packages
         """
+        if self.is_extension and not args and not kwargs:
+            exts_filter = self.cfg.get_ref('exts_filter')
+            if exts_filter is None or tuple(exts_filter) == EXTS_FILTER_R_PACKAGES:
+                res = self.batched_sanity_check()
+                if res is not None:
+                    return res
+
         return super(RPackage, self).sanity_check_step(EXTS_FILTER_R_PACKAGES, *args, **kwargs)
 
+    def batched_sanity_check(self):
+        """
+        Check whether this R package can be loaded, using results obtained for all R packages installed
+        as extensions by the same parent installation with only a few R sessions,
+        rather than starting a separate R session for each R package.
+
+        Returns None if no result is available for this R package.
+        """
+        pkg_name = self.options.get('modulename', self.name)
+        if pkg_name is False:
+            return None
+
+        load_results = getattr(self.master, 'r_pkgs_load_results', None)
+        if load_results is None:
+            pkg_names = []
+            for ext in getattr(self.master, 'ext_instances', []):
+                if isinstance(ext, RPackage):
+                    ext_pkg_name = ext.options.get('modulename', ext.name)
+                    if ext_pkg_name is not False:
+                        pkg_names.append(ext_pkg_name)
+
+            self.log.info("Checking whether %d R packages can be loaded", len(pkg_names))
+            load_results = get_r_pkgs_load_results(pkg_names)
+            self.master.r_pkgs_load_results = load_results
+
+            load_times = sorted(((res[1], name) for (name, res) in load_results.items()), reverse=True)
+            self.log.info("Load time for R packages (in seconds): %s",
+                          ', '.join('%s: %.3f' % (name, load_time) for (load_time, name) in load_times))
+
+        if pkg_name not in load_results:
+            return None
+
+        success, load_time, err_msg = load_results[pkg_name]
+        if success:
+            self.log.info("R package %s loaded successfully (in %.3f seconds)", pkg_name, load_time)
+            res = (True, '')
+        else:
+            fail_msg = "loading R package %s via library(%s) failed: %s" % (pkg_name, pkg_name, err_msg)
+            self.log.warning("Sanity check for '%s' extension failed: %s", self.name, fail_msg)
+            self.sanity_check_fail_msgs.append(fail_msg)
+            res = (False, fail_msg)
+
+        return res
+
     def make_module_extra(self):
         """Add install path to R_LIBS"""
         # prepend R_LIBS with install path
@@ -64,9 +64,66 @@ class RubyGem(ExtensionEasyBlock):
         super(RubyGem, self).run()
 
         self.ext_src = self.src
+
+        # Ruby gems installed with the generic RubyGem easyblock can be installed in batch
+        if self.cfg.get('batch_install') and self.__class__ is RubyGem and not self.dry_run:
+            if getattr(self.master, 'ruby_gems_batch', None) is None:
+                self.master.ruby_gems_batch = []
+            self.log.info("Adding Ruby gem %s to batch of Ruby gems to install", self.name)
+            self.master.ruby_gems_batch.append((self.name, self.ext_src))
+            if self.is_last_in_batch():
+                self.install_batch()
+            return
+
+        # install pending batch of Ruby gems first, to retain installation order
+        self.install_batch()
+
         self.log.debug("Installing Ruby gem %s version %s." % (self.name, self.version))
         self.install_step()
 
+    def is_last_in_batch(self):
+        """
+        Check whether the batch of Ruby gems should be installed after adding this Ruby gem to it,
+        which is the case if this is the last extension, or if the next extension is not a Ruby gem
+        (since that would not install the pending batch first, which would break the installation order).
+        """
+        exts = getattr(self.master, 'ext_instances', [])
+        idx = [i for i, ext in enumerate(exts) if ext is self]
+        return not idx or idx[0] + 1 >= len(exts) or not isinstance(exts[idx[0] + 1], RubyGem)
+
+    def install_batch(self):
+        """
+        Install batch of Ruby gems with a single 'gem install' command, in order;
+        if that fails, Ruby gems are installed one by one to determine which ones are failing.
+        """
+        batch = getattr(self.master, 'ruby_gems_batch', None)
+        self.master.ruby_gems_batch = None
+        if not batch:
+            return
+
+        gem_names = [x[0] for x in batch]
+        self.log.info("Installing batch of %d Ruby gems: %s", len(gem_names), ', '.join(gem_names))
+
+        self.prepare_gem_install()
+        cmd = self.gem_install_cmd([x[1] for x in batch])
+        (out, ec) = run_cmd(cmd, log_all=False, log_ok=False, simple=False)
+        if ec:
+            self.log.warning("Installing batch of Ruby gems failed (exit code %s), installing them one by one "
+                             "to determine which ones are failing; output:\n%s", ec, out)
+            failed = []
+            for (gem_name, gem_src) in batch:
+                (out, ec) = run_cmd(self.gem_install_cmd([gem_src]), log_all=False, log_ok=False, simple=False)
+                if ec:
+                    self.log.warning("Installation of Ruby gem %s failed:\n%s", gem_name, out)
+                    failed.append(gem_name)
+                else:
+                    self.log.info("Ruby gem %s installed successfully", gem_name)
+
+            if failed:
+                raise EasyBuildError("Errors detected during installation of Ruby gems %s", ', '.join(failed))
+        else:
+            self.log.info("Batch of Ruby gems installed successfully, output:\n%s", out)
+
     def extract_step(self):
         """Skip extraction of .gem files, which are installed as downloaded"""
 
@@ -102,8 +159,8 @@ class RubyGem(ExtensionEasyBlock):
         """No separate (standard) test procedure for Ruby Gems."""
         pass
 
-    def install_step(self):
-        """Install Ruby Gems using gem package manager"""
+    def prepare_gem_install(self):
+        """Prepare for installing Ruby gems."""
         ruby_root = get_software_root('Ruby')
         if not ruby_root:
             raise EasyBuildError("Ruby module not loaded?")
@@ -112,8 +169,19 @@ class RubyGem(ExtensionEasyBlock):
         if not self.is_extension or self.master.name != 'Ruby':
             env.setvar('GEM_HOME', self.installdir)
 
+    def gem_install_cmd(self, gem_srcs):
+        """Compose command to install specified Ruby gems."""
         bindir = os.path.join(self.installdir, 'bin')
-        run_cmd("gem install --bindir %s --local %s" % (bindir, self.ext_src))
+        cmd = "gem install --bindir %s --local %s" % (bindir, ' '.join(gem_srcs))
+        # build native extensions of Ruby gems in parallel
+        if self.cfg['parallel'] and self.cfg['parallel'] > 1:
+            cmd = "MAKEFLAGS=-j%s %s" % (self.cfg['parallel'], cmd)
+        return cmd
+
+    def install_step(self):
+        """Install Ruby Gems using gem package manager"""
+        self.prepare_gem_install()
+        run_cmd(self.gem_install_cmd([self.ext_src]))
 
     def make_module_extra(self):
         """Extend $GEM_PATH in module file."""
@@ -28,21 +28,41 @@ EasyBuild support for building and installing HPCG, implemented as an easyblock
 @author: Kenneth Hoste (Ghent University)
 """
 import glob
+import json
 import os
 import re
 import shutil
 
 from easybuild.easyblocks.generic.configuremake import ConfigureMake
+from easybuild.framework.easyconfig import CUSTOM
 from easybuild.tools.build_log import EasyBuildError
-from easybuild.tools.config import build_option
-from easybuild.tools.filetools import mkdir
+from easybuild.tools.config import build_option, log_path
+from easybuild.tools.filetools import mkdir, read_file, write_file
 from easybuild.tools.run import run_cmd
 from distutils.version import LooseVersion
 
+# name of file in which performance measured during test step is stored (in JSON format),
+# in same subdirectory of installation directory as (copy of) build log
+HPCG_RESULTS_FILENAME = 'hpcg_results.json'
+
 
 class EB_HPCG(ConfigureMake):
     """Support for building/installing HPCG."""
 
+    @staticmethod
+    def extra_options(extra_vars=None):
+        """Define custom easyconfig parameters for HPCG."""
+        extra_vars = ConfigureMake.extra_options(extra_vars)
+        extra_vars.update({
+            'min_gflops': [None, "Minimal performance (in GFLOP/s) that should be reached in test run", CUSTOM],
+        })
+        return extra_vars
+
+    def __init__(self, *args, **kwargs):
+        """Initialize HPCG-specific variables."""
+        super(EB_HPCG, self).__init__(*args, **kwargs)
+        self.test_results = None
+
     def configure_step(self):
         """Custom configuration procedure for HPCG."""
 
@@ -77,6 +97,10 @@ class EB_HPCG(ConfigureMake):
             cmd = "PATH=%s:$PATH OMP_NUM_THREADS=2 %s" % (objbindir, hpcg_mpi_cmd)
             run_cmd(cmd, simple=True, log_all=True, log_ok=True)
 
+            if self.dry_run:
+                self.log.info("Not checking HPCG output in dry run mode")
+                return
+
             # find log file, check for success
             success_regex = re.compile(r"Scaled Residual \[[0-9.e-]+\]")
             try:
@@ -95,6 +119,31 @@ class EB_HPCG(ConfigureMake):
             except OSError as err:
                 raise EasyBuildError("Failed to check for success in HPCG log file: %s", err)
 
+            # determine performance; HPCG v3.x reports it in separate HPCG-Benchmark*.txt file
+            gflops_regex = re.compile(r"GFLOP/s rating of\s*[=:]\s*(?P<gflops>[0-9.eE+-]+)")
+            gflops = None
+            for hpcg_out in glob.glob('HPCG-Benchmark*.txt') + hpcg_logs:
+                res = gflops_regex.search(read_file(hpcg_out))
+                if res:
+                    gflops = float(res.group('gflops'))
+                    self.log.info("HPCG performance found in %s: %s GFLOP/s", hpcg_out, gflops)
+                    break
+
+            if gflops is None:
+                raise EasyBuildError("Failed to determine performance from HPCG output (pattern '%s')",
+                                     gflops_regex.pattern)
+
+            self.test_results = {
+                'gflops': gflops,
+                'mpi_ranks': 2,
+                'omp_num_threads': 2,
+            }
+
+            min_gflops = self.cfg['min_gflops']
+            if min_gflops is not None and gflops < min_gflops:
+                raise EasyBuildError("HPCG performance of %s GFLOP/s is below minimum of %s GFLOP/s",
+                                     gflops, min_gflops)
+
     def install_step(self):
         """Custom install procedure for HPCG."""
         objbindir = os.path.join(self.cfg['start_dir'], 'obj', 'bin')
@@ -104,6 +153,12 @@ class EB_HPCG(ConfigureMake):
         except OSError as err:
             raise EasyBuildError("Failed to copy HPCG files to %s: %s", bindir, err)
 
+        # store performance measured in test step
+        if self.test_results:
+            results_file = os.path.join(self.installdir, log_path(ec=self.cfg), HPCG_RESULTS_FILENAME)
+            write_file(results_file, json.dumps(self.test_results, indent=4, sort_keys=True))
+            self.log.info("HPCG performance results stored in %s", results_file)
+
     def sanity_check_step(self):
         """Custom sanity check for HPCG."""
         custom_paths = {
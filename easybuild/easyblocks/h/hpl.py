@@ -32,13 +32,47 @@ EasyBuild support for building and installing HPL, implemented as an easyblock
 @author: Jens Timmerman (Ghent University)
 """
 
+import json
 import os
+import re
 import shutil
 
 from easybuild.easyblocks.generic.configuremake import ConfigureMake
+from easybuild.framework.easyconfig import CUSTOM
 from easybuild.tools.build_log import EasyBuildError
+from easybuild.tools.config import build_option, log_path
+from easybuild.tools.filetools import write_file
 from easybuild.tools.run import run_cmd
 
+# name of file in which performance measured during test step is stored (in JSON format),
+# in same subdirectory of installation directory as (copy of) build log
+HPL_RESULTS_FILENAME = 'hpl_results.json'
+
+
+def parse_hpl_output(txt):
+    """
+    Parse HPL output for performance results.
+
+    :return: list of dicts with encoded variant, problem size (N), block size (NB), process grid (P, Q),
+             time (in seconds) and performance (in GFLOP/s) for each test
+    """
+    # example line:
+    # WR00L2L2          29     1     2     2               0.00              9.8363e-03
+    result_regex = re.compile(r"^(?P<tv>W[RC]\S+)\s+(?P<n>[0-9]+)\s+(?P<nb>[0-9]+)\s+(?P<p>[0-9]+)\s+(?P<q>[0-9]+)\s+"
+                              r"(?P<time>[0-9.eE+-]+)\s+(?P<gflops>[0-9.eE+-]+)\s*$", re.M)
+    results = []
+    for res in result_regex.finditer(txt):
+        results.append({
+            'tv': res.group('tv'),
+            'n': int(res.group('n')),
+            'nb': int(res.group('nb')),
+            'p': int(res.group('p')),
+            'q': int(res.group('q')),
+            'time': float(res.group('time')),
+            'gflops': float(res.group('gflops')),
+        })
+    return results
+
 
 class EB_HPL(ConfigureMake):
     """
@@ -47,6 +81,20 @@ class EB_HPL(ConfigureMake):
     - build with make and install
     """
 
+    @staticmethod
+    def extra_options(extra_vars=None):
+        """Define custom easyconfig parameters for HPL."""
+        extra_vars = ConfigureMake.extra_options(extra_vars)
+        extra_vars.update({
+            'min_gflops': [None, "Minimal performance (in GFLOP/s) that should be reached in test run", CUSTOM],
+        })
+        return extra_vars
+
+    def __init__(self, *args, **kwargs):
+        """Initialize HPL-specific variables."""
+        super(EB_HPL, self).__init__(*args, **kwargs)
+        self.test_results = None
+
     def configure_step(self, subdir=None):
         """
         Create Make.UNKNOWN file to build from
@@ -110,6 +158,43 @@ class EB_HPL(ConfigureMake):
         self.cfg.update('buildopts', extra_makeopts)
         super(EB_HPL, self).build_step()
 
+    def test_step(self):
+        """
+        Run HPL using the HPL.dat input file that is included with HPL, and determine the measured performance.
+        """
+        if self.cfg['runtest']:
+
+            if not build_option('mpi_tests'):
+                self.log.info("Skipping testing of HPL since MPI testing is disabled")
+                return
+
+            bindir = os.path.join(self.cfg['start_dir'], 'bin', 'UNKNOWN')
+            # default HPL.dat uses process grids with 4 MPI processes (2x2, 1x4, 4x1)
+            cmd = self.toolchain.mpi_cmd_for("./xhpl", 4)
+            (out, _) = run_cmd(cmd, path=bindir, log_all=True, simple=False)
+
+            if self.dry_run:
+                self.log.info("Not checking HPL output in dry run mode")
+                return
+
+            results = parse_hpl_output(out)
+            if not results:
+                raise EasyBuildError("Failed to determine performance from HPL output")
+
+            failed_regex = re.compile(r"^\s*([0-9]+) tests completed and failed residual checks", re.M)
+            res = failed_regex.search(out)
+            if res and int(res.group(1)) > 0:
+                raise EasyBuildError("%s HPL test(s) failed residual checks", res.group(1))
+
+            max_gflops = max(x['gflops'] for x in results)
+            self.log.info("Maximum HPL performance: %s GFLOP/s (%d tests)", max_gflops, len(results))
+            self.test_results = {'gflops': max_gflops, 'tests': results}
+
+            min_gflops = self.cfg['min_gflops']
+            if min_gflops is not None and max_gflops < min_gflops:
+                raise EasyBuildError("HPL performance of %s GFLOP/s is below minimum of %s GFLOP/s",
+                                     max_gflops, min_gflops)
+
     def install_step(self):
         """
         Install by copying files to install dir
@@ -125,6 +210,12 @@ class EB_HPL(ConfigureMake):
         except OSError as err:
             raise EasyBuildError("Copying %s to installation dir %s failed: %s", srcfile, destdir, err)
 
+        # store performance measured in test step
+        if self.test_results:
+            results_file = os.path.join(self.installdir, log_path(ec=self.cfg), HPL_RESULTS_FILENAME)
+            write_file(results_file, json.dumps(self.test_results, indent=4, sort_keys=True))
+            self.log.info("HPL performance results stored in %s", results_file)
+
     def sanity_check_step(self):
         """
         Custom sanity check for HPL
@@ -38,6 +38,7 @@ from distutils.version import LooseVersion
 
 import easybuild.tools.toolchain as toolchain
 from easybuild.easyblocks.generic.intelbase import IntelBase, ACTIVATION_NAME_2012, LICENSE_FILE_NAME_2012
+from easybuild.easyblocks.utilities import mpi_pingpong_extra_options, run_mpi_pingpong_check
 from easybuild.framework.easyconfig import CUSTOM
 from easybuild.tools.build_log import EasyBuildError
 from easybuild.tools.filetools import apply_regex_substitutions, change_dir, extract_file, mkdir, write_file
@@ -62,6 +63,7 @@ class EB_impi(IntelBase):
             'set_mpi_wrapper_aliases_intel': [False, 'Set compiler for mpiicc/mpiicpc/mpiifort via aliases', CUSTOM],
             'set_mpi_wrappers_all': [False, 'Set (default) compiler for all MPI wrapper commands', CUSTOM],
         }
+        extra_vars.update(mpi_pingpong_extra_options())
         return IntelBase.extra_options(extra_vars)
 
     def prepare_step(self, *args, **kwargs):
@@ -224,11 +226,7 @@ EULA=accept
             self.log.info("Adding minimal MPI test program to sanity checks: %s", impi_testsrc)
 
             # Build test program with appropriate compiler from current toolchain
-            comp_fam = self.toolchain.comp_family()
-            if comp_fam == toolchain.INTELCOMP:
-                build_comp = 'mpiicc'
-            else:
-                build_comp = 'mpicc'
+            build_comp = self.mpi_c_compiler()
             build_cmd = "%s %s -o %s" % (build_comp, impi_testsrc, impi_testexe)
 
             # Execute test program with appropriate MPI executable for target toolchain
@@ -242,6 +240,41 @@ EULA=accept
 
         super(EB_impi, self).sanity_check_step(custom_paths=custom_paths, custom_commands=custom_commands)
 
+        if self.cfg['mpi_pingpong_check']:
+            self.mpi_pingpong_check()
+
+    def mpi_c_compiler(self):
+        """Determine MPI compiler wrapper for C that matches compiler in current toolchain."""
+        if self.toolchain.comp_family() == toolchain.INTELCOMP:
+            return 'mpiicc'
+        else:
+            return 'mpicc'
+
+    def mpi_pingpong_check(self):
+        """Run two-rank ping-pong test on local node, using only shared memory."""
+        if self.dry_run:
+            self.log.info("Skipping MPI ping-pong test in dry run mode")
+            return
+
+        # only use shared memory for communication between ranks
+        if LooseVersion(self.version) >= LooseVersion('2019'):
+            fabrics = 'shm'
+        else:
+            fabrics = 'shm:shm'
+
+        params = {'nr_ranks': 2, 'cmd': '%(cmd)s'}
+        mpi_cmd_tmpl, params = get_mpi_cmd_template(toolchain.INTELMPI, params, mpi_version=self.version)
+        mpi_cmd_tmpl = "I_MPI_FABRICS=%s %s" % (fabrics, mpi_cmd_tmpl % params)
+
+        fake_mod_data = self.load_fake_module(purge=True)
+        try:
+            run_mpi_pingpong_check(self.builddir, mpi_cmd_tmpl, compiler=self.mpi_c_compiler(),
+                                   max_latency=self.cfg['mpi_pingpong_max_latency'],
+                                   min_bandwidth=self.cfg['mpi_pingpong_min_bandwidth'],
+                                   fail=self.cfg['mpi_pingpong_fail'])
+        finally:
+            self.clean_up_fake_module(fake_mod_data)
+
     def make_module_req_guess(self):
         """
         A dictionary of possible directories to look for
@@ -38,6 +38,7 @@ from distutils.version import LooseVersion
 
 import easybuild.tools.environment as env
 from easybuild.easyblocks.generic.configuremake import ConfigureMake
+from easybuild.easyblocks.utilities import mpi_pingpong_extra_options, run_mpi_pingpong_check
 from easybuild.framework.easyconfig import CUSTOM
 from easybuild.tools.build_log import EasyBuildError
 from easybuild.tools.systemtools import get_shared_lib_ext
@@ -56,6 +57,7 @@ class EB_MPICH(ConfigureMake):
         extra_vars.update({
             'debug': [False, "Enable debug build (which is slower)", CUSTOM],
         })
+        extra_vars.update(mpi_pingpong_extra_options())
         return extra_vars
 
     # MPICH configure script complains when F90 or F90FLAGS are set,
@@ -167,3 +169,23 @@ class EB_MPICH(ConfigureMake):
         custom_paths.setdefault('files', []).extend(bins + headers + libs)
 
         super(EB_MPICH, self).sanity_check_step(custom_paths=custom_paths)
+
+        if self.cfg['mpi_pingpong_check']:
+            self.mpi_pingpong_check()
+
+    def mpi_pingpong_check(self):
+        """Run two-rank ping-pong test on local node, using only shared memory."""
+        if self.dry_run:
+            self.log.info("Skipping MPI ping-pong test in dry run mode")
+            return
+
+        # Hydra process manager launches ranks on local node via fork, using shared memory for communication
+        mpi_cmd_tmpl = "mpiexec -launcher fork -n 2 %(cmd)s"
+
+        fake_mod_data = self.load_fake_module(purge=True)
+        try:
+            run_mpi_pingpong_check(self.builddir, mpi_cmd_tmpl, max_latency=self.cfg['mpi_pingpong_max_latency'],
+                                   min_bandwidth=self.cfg['mpi_pingpong_min_bandwidth'],
+                                   fail=self.cfg['mpi_pingpong_fail'])
+        finally:
+            self.clean_up_fake_module(fake_mod_data)
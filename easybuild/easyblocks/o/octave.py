@@ -45,10 +45,18 @@ class EB_Octave(ConfigureMake):
     @staticmethod
     def extra_options():
         extra_vars = {
+            'batch_install': [False, "Install Octave packages that are installed as extensions in a single Octave "
+                                     "session", CUSTOM],
             'blas_lapack_mt': [False, "Link with multi-threaded BLAS/LAPACK library", CUSTOM],
         }
         return ConfigureMake.extra_options(extra_vars)
 
+    def __init__(self, *args, **kwargs):
+        """Initialize Octave-specific class variables."""
+        super(EB_Octave, self).__init__(*args, **kwargs)
+
+        self.octave_pkgs_batch = None
+
     def configure_step(self):
         """Custom configuration procedure for Octave."""
 
@@ -36,6 +36,8 @@ EasyBuild support for building and installing OpenFOAM, implemented as an easybl
 """
 
 import glob
+import hashlib
+import json
 import os
 import re
 import shutil
@@ -46,16 +48,40 @@ import easybuild.tools.environment as env
 import easybuild.tools.toolchain as toolchain
 from easybuild.easyblocks.generic.cmakemake import setup_cmake_env
 from easybuild.framework.easyblock import EasyBlock
+from easybuild.framework.easyconfig import CUSTOM
 from easybuild.tools.build_log import EasyBuildError
-from easybuild.tools.filetools import adjust_permissions, apply_regex_substitutions, mkdir
+from easybuild.tools.config import build_path
+from easybuild.tools.filetools import adjust_permissions, apply_regex_substitutions, copy_dir, mkdir, read_file
+from easybuild.tools.filetools import remove_dir, write_file
 from easybuild.tools.modules import get_software_root, get_software_version
 from easybuild.tools.run import run_cmd, run_cmd_qa
 from easybuild.tools.systemtools import get_shared_lib_ext, get_cpu_architecture, AARCH64, POWER
 
+# name of file (in cache directory for platform build directory) in which build settings are recorded
+BUILD_FINGERPRINT_FILENAME = 'build_fingerprint.json'
+
+# environment variables that determine the contents of the platform build directory
+BUILD_FINGERPRINT_ENV_VARS = ['CC', 'CXX', 'CFLAGS', 'CXXFLAGS', 'MPICC', 'MPICXX', 'WM_COMPILER',
+                              'WM_COMPILE_OPTION', 'WM_LABEL_SIZE', 'WM_MPLIB', 'WM_THIRD_PARTY_DIR']
+
 
 class EB_OpenFOAM(EasyBlock):
     """Support for building and installing OpenFOAM."""
 
+    @staticmethod
+    def extra_options():
+        """Custom easyconfig parameters for OpenFOAM."""
+        extra_vars = {
+            'skip_clean_if_unchanged': [False, "Keep a copy of the platform build directory outside of the "
+                                               "installation directory, and reuse it rather than doing a clean build "
+                                               "if the next build uses the same sources, patches, toolchain and WM_* "
+                                               "settings", CUSTOM],
+            'platform_build_cache_dir': [None, "Directory in which copies of platform build directories are kept "
+                                               "for 'skip_clean_if_unchanged' (default: 'openfoam-platforms' "
+                                               "subdirectory of build path)", CUSTOM],
+        }
+        return EasyBlock.extra_options(extra_vars)
+
     def __init__(self, *args, **kwargs):
         """Specify that OpenFOAM should be built in install dir."""
 
@@ -67,6 +93,7 @@ class EB_OpenFOAM(EasyBlock):
         self.wm_mplib = None
         self.openfoamdir = None
         self.thrdpartydir = None
+        self.skip_clean = False
 
         # version may start with 'v' for some variants of OpenFOAM
         # we need to strip this off to avoid problems when comparing LooseVersion instances in Python 3
@@ -290,6 +317,93 @@ class EB_OpenFOAM(EasyBlock):
                     else:
                         env.setvar("%s_ROOT" % depend.upper(), dependloc)
 
+        if self.cfg['skip_clean_if_unchanged'] and not self.dry_run:
+            self.restore_platform_build_dir()
+
+    def det_platform_dir(self):
+        """
+        Determine path to platform-specific build directory,
+        or None if build artifacts are not located in a dedicated directory for this OpenFOAM version.
+        """
+        openfoam_extend_v3 = 'extend' in self.name.lower() and self.looseversion >= LooseVersion('3.0')
+        if self.looseversion < LooseVersion('2') or openfoam_extend_v3:
+            return None
+        return os.path.join(self.installdir, self.openfoamdir, 'platforms', self.det_psubdir())
+
+    def det_platform_cache_dir(self):
+        """Determine cache directory to keep copy of platform build directory in between builds."""
+        cache_dir = self.cfg['platform_build_cache_dir'] or os.path.join(build_path(), 'openfoam-platforms')
+        # build artifacts include absolute paths, so they can only be reused for the same installation directory
+        return os.path.join(cache_dir, hashlib.sha256(self.installdir.encode('utf-8')).hexdigest())
+
+    def det_build_fingerprint(self):
+        """Determine fingerprint of settings that affect the contents of the platform build directory."""
+        fingerprint = {
+            'toolchain': '%s/%s' % (self.toolchain.name, self.toolchain.version),
+            'dependencies': sorted('%s/%s' % (dep['name'], dep['version']) for dep in self.cfg.dependencies()),
+            'platform': self.det_psubdir(),
+            'prebuildopts': self.cfg['prebuildopts'],
+            # patches that are no longer applied result in files with an older timestamp,
+            # so changes to sources and patches must also be taken into account
+            'sources': [os.path.basename(src['path']) for src in self.src],
+            'patches': [os.path.basename(patch['path']) for patch in self.patches],
+            'checksums': self.cfg['checksums'],
+        }
+        for env_var in BUILD_FINGERPRINT_ENV_VARS:
+            fingerprint[env_var] = os.environ.get(env_var)
+
+        # normalise fingerprint, so it can be compared with one that was loaded from file
+        return json.loads(json.dumps(fingerprint, sort_keys=True))
+
+    def restore_platform_build_dir(self):
+        """
+        Restore copy of platform build directory from previous build, if it was built with the same settings,
+        so cleaning it before running Allwmake can be skipped; only files that have changed since are rebuilt.
+        """
+        platform_dir = self.det_platform_dir()
+        if platform_dir is None:
+            self.log.warning("Reusing platform build directory is not supported for %s v%s", self.name, self.version)
+            return
+
+        cache_dir = self.det_platform_cache_dir()
+        cached_platform_dir = os.path.join(cache_dir, os.path.basename(platform_dir))
+        fingerprint_path = os.path.join(cache_dir, BUILD_FINGERPRINT_FILENAME)
+
+        if not os.path.isdir(cached_platform_dir) or not os.path.exists(fingerprint_path):
+            self.log.info("No copy of platform build directory found in %s, so clean build is required", cache_dir)
+            return
+
+        try:
+            prev_fingerprint = json.loads(read_file(fingerprint_path))
+        except ValueError as err:
+            self.log.warning("Failed to parse build fingerprint %s: %s", fingerprint_path, err)
+            prev_fingerprint = None
+
+        fingerprint = self.det_build_fingerprint()
+        if prev_fingerprint == fingerprint:
+            self.log.info("Build fingerprint in %s matches current settings, so restoring %s from %s",
+                          fingerprint_path, platform_dir, cached_platform_dir)
+            remove_dir(platform_dir)
+            # copy_dir retains timestamps of files, so make only rebuilds what was changed since
+            copy_dir(cached_platform_dir, platform_dir, symlinks=True)
+            self.skip_clean = True
+        else:
+            self.log.info("Build fingerprint in %s does not match current settings, so clean build is required "
+                          "(previous: %s; current: %s)", fingerprint_path, prev_fingerprint, fingerprint)
+
+    def save_platform_build_dir(self):
+        """Keep copy of platform build directory (outside of installation directory) for next build."""
+        platform_dir = self.det_platform_dir()
+        if platform_dir is None or not os.path.isdir(platform_dir):
+            return
+
+        cache_dir = self.det_platform_cache_dir()
+        remove_dir(cache_dir)
+        copy_dir(platform_dir, os.path.join(cache_dir, os.path.basename(platform_dir)), symlinks=True)
+        fingerprint_path = os.path.join(cache_dir, BUILD_FINGERPRINT_FILENAME)
+        write_file(fingerprint_path, json.dumps(self.det_build_fingerprint(), indent=4, sort_keys=True))
+        self.log.info("Copy of platform build directory %s kept in %s", platform_dir, cache_dir)
+
     def build_step(self):
         """Build OpenFOAM using make after sourcing script to set environment."""
 
@@ -306,6 +420,10 @@ class EB_OpenFOAM(EasyBlock):
         else:
             cleancmd = "wcleanAll"
 
+        if self.skip_clean:
+            self.log.info("Platform build directory was restored from previous build, so skipping '%s'", cleancmd)
+            cleancmd = 'true'
+
         # make directly in install directory
         cmd_tmpl = "%(precmd)s && %(cleancmd)s && %(prebuildopts)s %(makecmd)s" % {
             'precmd': precmd,
@@ -337,6 +455,9 @@ class EB_OpenFOAM(EasyBlock):
                 cmd += ' -log'
             run_cmd(cmd_tmpl % cmd, log_all=True, simple=True, log_output=True)
 
+        if self.cfg['skip_clean_if_unchanged'] and not self.dry_run:
+            self.save_platform_build_dir()
+
     def det_psubdir(self):
         """Determine the platform-specific installation directory for OpenFOAM."""
         # OpenFOAM >= 3.0.0 can use 64 bit integers
@@ -32,6 +32,7 @@ import re
 from distutils.version import LooseVersion
 
 from easybuild.easyblocks.generic.configuremake import ConfigureMake
+from easybuild.easyblocks.utilities import mpi_pingpong_extra_options, run_mpi_pingpong_check
 from easybuild.tools.modules import get_software_root
 from easybuild.tools.systemtools import check_os_dependency, get_shared_lib_ext
 
@@ -39,6 +40,13 @@ from easybuild.tools.systemtools import check_os_dependency, get_shared_lib_ext
 class EB_OpenMPI(ConfigureMake):
     """OpenMPI easyblock."""
 
+    @staticmethod
+    def extra_options(extra_vars=None):
+        """Define custom easyconfig parameters specific to OpenMPI."""
+        extra_vars = ConfigureMake.extra_options(extra_vars)
+        extra_vars.update(mpi_pingpong_extra_options())
+        return extra_vars
+
     def configure_step(self):
         """Custom configuration step for OpenMPI."""
 
@@ -133,3 +141,33 @@ class EB_OpenMPI(ConfigureMake):
         custom_commands = ["%s --version | grep '%s'" % (key, expected[key]) for key in sorted(expected.keys())]
 
         super(EB_OpenMPI, self).sanity_check_step(custom_paths=custom_paths, custom_commands=custom_commands)
+
+        if self.cfg['mpi_pingpong_check']:
+            self.mpi_pingpong_check()
+
+    def mpi_pingpong_check(self):
+        """Run two-rank ping-pong test on local node, using only shared memory."""
+        if self.dry_run:
+            self.log.info("Skipping MPI ping-pong test in dry run mode")
+            return
+
+        # only use shared memory (+ self) BTL, via ob1 PML (to avoid that UCX or other PMLs are picked up)
+        if LooseVersion(self.version) >= LooseVersion('2.0'):
+            shm_btl = 'vader'
+        else:
+            shm_btl = 'sm'
+        mca_env = ["OMPI_MCA_pml=ob1", "OMPI_MCA_btl=self,%s" % shm_btl]
+
+        # allow oversubscription, to avoid failure if only a single core is available
+        if LooseVersion(self.version) >= LooseVersion('3.0'):
+            mca_env.append("OMPI_MCA_rmaps_base_oversubscribe=true")
+
+        mpi_cmd_tmpl = ' '.join(mca_env + ["mpirun -np 2 %(cmd)s"])
+
+        fake_mod_data = self.load_fake_module(purge=True)
+        try:
+            run_mpi_pingpong_check(self.builddir, mpi_cmd_tmpl, max_latency=self.cfg['mpi_pingpong_max_latency'],
+                                   min_bandwidth=self.cfg['mpi_pingpong_min_bandwidth'],
+                                   fail=self.cfg['mpi_pingpong_fail'])
+        finally:
+            self.clean_up_fake_module(fake_mod_data)
@@ -29,7 +29,10 @@ EasyBuild support for Perl, implemented as an easyblock
 @author: Kenneth Hoste (Ghent University)
 """
 import os
+import re
+import time
 
+from easybuild.base import fancylogger
 from easybuild.easyblocks.generic.configuremake import ConfigureMake
 from easybuild.framework.easyconfig import CUSTOM
 from easybuild.tools.config import build_option
@@ -118,15 +121,30 @@ class EB_Perl(ConfigureMake):
         """Test Perl build via 'make test'."""
         # allow escaping with runtest = False
         if self.cfg['runtest'] is None or self.cfg['runtest']:
+            parallel = self.cfg['parallel'] or 1
             if isinstance(self.cfg['runtest'], string_type):
                 cmd = "make %s" % self.cfg['runtest']
+            elif parallel > 1:
+                # only the test harness supports running tests in parallel (via $TEST_JOBS)
+                cmd = "make test_harness"
             else:
                 cmd = "make test"
 
             # specify locale to be used, to avoid that a handful of tests fail
             cmd = "export LC_ALL=C && %s" % cmd
 
-            run_cmd(cmd, log_all=False, log_ok=False, simple=False)
+            if parallel > 1:
+                cmd = "export TEST_JOBS=%s && %s" % (parallel, cmd)
+
+            start_time = time.time()
+            (out, _) = run_cmd(cmd, log_all=False, log_ok=False, simple=False)
+            self.log.info("Running Perl tests took %.1f seconds", time.time() - start_time)
+
+            test_summary = parse_perl_test_summary(out)
+            if test_summary['failed_tests']:
+                self.log.warning("%d failing Perl test files: %s", len(test_summary['failed_tests']),
+                                 ', '.join(test_summary['failed_tests']))
+            self.log.info("Summary of Perl test results: %s", test_summary)
 
     def prepare_for_extensions(self):
         """
@@ -152,6 +170,50 @@ class EB_Perl(ConfigureMake):
         super(EB_Perl, self).sanity_check_step(custom_paths=custom_paths)
 
 
+def parse_perl_test_summary(out):
+    """
+    Parse summary at the end of the output of running Perl tests,
+    as produced by either the serial test driver (t/TEST) or the test harness (t/harness).
+
+    :param out: output produced by running Perl tests
+    :return: dict with list of failed test files ('failed_tests'), number of test files ('files'),
+             and test time in seconds ('time') as reported by test driver/harness (None if not found)
+    """
+    summary = {'failed_tests': [], 'files': None, 'time': None}
+
+    # test harness reports something like:
+    #   Test Summary Report
+    #   -------------------
+    #   op/foo.t      (Wstat: 256 Tests: 10 Failed: 1)
+    #     Failed test:  3
+    #   Files=2412, Tests=1163427, 512 wallclock secs (...)
+    #   Result: FAIL
+    summary['failed_tests'] = re.findall(r'^(\S+\.t)\s+\(Wstat:', out, re.M)
+    res = re.search(r'^Files=([0-9]+), Tests=[0-9]+,\s+([0-9]+) wallclock secs', out, re.M)
+    if res:
+        summary['files'] = int(res.group(1))
+        summary['time'] = int(res.group(2))
+    else:
+        # serial test driver reports something like:
+        #   Failed 2 tests out of 2412, 99.92% okay.
+        #       ../lib/foo.t
+        #       op/bar.t
+        #   ...
+        #   u=10.65  s=3.07  cu=620.21  cs=45.74  scripts=2412  tests=1163427
+        #   Elapsed: 1043 sec
+        res = re.search(r'^Failed [0-9]+ tests? out of [0-9]+.*\n((?:\s+\S+\.t\n)+)', out, re.M)
+        if res:
+            summary['failed_tests'] = res.group(1).split()
+        res = re.search(r'\bscripts=([0-9]+)\s', out)
+        if res:
+            summary['files'] = int(res.group(1))
+        res = re.search(r'^Elapsed: ([0-9]+) sec', out, re.M)
+        if res:
+            summary['time'] = int(res.group(1))
+
+    return summary
+
+
 def get_major_perl_version():
     """"
     Returns the major verson of the perl binary in the current path
@@ -174,3 +236,39 @@ def get_site_suffix(tag):
     (sitesuffix, _) = run_cmd(cmd, log_all=True, log_output=True, simple=False)
     # obtained value usually contains leading '/', so strip it off
     return sitesuffix.lstrip(os.path.sep)
+
+
+def get_perl_module_locations(modnames):
+    """
+    Determine location of specified Perl modules using a single 'perl' command,
+    similar to what 'perldoc -lm <module>' does for a single Perl module
+
+    :param modnames: list of Perl module names (e.g. 'Config::General')
+    :return: dict with location of each Perl module (None for Perl modules that were not found);
+             Perl modules for which no result was reported are not included
+    """
+    log = fancylogger.getLogger('get_perl_module_locations', fname=False)
+
+    # module names are passed via stdin, one per line, to avoid hitting limits on command line length
+    perl_cmd = ' '.join([
+        'while (my $mod = <STDIN>) {',
+        'chomp $mod; (my $relpath = $mod) =~ s{::}{/}g;',
+        'my @found = grep { -f $_ } map { ("$_/$relpath.pm", "$_/$relpath.pod") } @INC;',
+        'print @found ? "FOUND $mod $found[0]\\n" : "MISSING $mod\\n";',
+        '}',
+    ])
+    cmd = "perl -e '%s'" % perl_cmd
+    (out, ec) = run_cmd(cmd, inp='\n'.join(modnames) + '\n', log_ok=False, simple=False, regexp=False)
+
+    res = {}
+    if ec:
+        log.warning("Failed to determine location of Perl modules %s: %s", ', '.join(modnames), out)
+    else:
+        for line in out.splitlines():
+            parts = line.split(' ', 2)
+            if len(parts) == 3 and parts[0] == 'FOUND':
+                res[parts[1]] = parts[2]
+            elif len(parts) == 2 and parts[0] == 'MISSING':
+                res[parts[1]] = None
+
+    return res
@@ -79,7 +79,9 @@ class EB_PETSc(ConfigureMake):
             'runtest': ['test', "Make target to test build", BUILD],
             'download_deps_static': [[], "Dependencies that should be downloaded and installed static", CUSTOM],
             'download_deps_shared': [[], "Dependencies that should be downloaded and installed shared", CUSTOM],
-            'download_deps': [[], "Dependencies that should be downloaded and installed", CUSTOM]
+            'download_deps': [[], "Dependencies that should be downloaded and installed; "
+                                  "source tarballs for these that are listed in sources are used rather than "
+                                  "letting PETSc download them", CUSTOM]
         }
         return ConfigureMake.extra_options(extra_vars)
 
@@ -91,6 +93,40 @@ class EB_PETSc(ConfigureMake):
 
         super(EB_PETSc, self).make_builddir()
 
+    def det_download_dep_sources(self):
+        """
+        Determine which of the dependencies that should be downloaded by PETSc are available as a source tarball
+        that is listed in sources (and hence was already downloaded and verified using checksums like any other source).
+
+        :return: dict with dependency names as keys and source entries as values
+        """
+        deps = self.cfg['download_deps'] + self.cfg['download_deps_static'] + self.cfg['download_deps_shared']
+
+        dep_srcs = {}
+        for dep in sorted(set(deps)):
+            # source tarball name starts with name of dependency, followed by version;
+            # or 'petsc-pkg-<name>-<commit>' (as used for the tarballs provided by PETSc via GitLab)
+            regex = re.compile(r'^(petsc-pkg-%(dep)s-|%(dep)s[-_.]?v?[0-9])' % {'dep': re.escape(dep)}, re.I)
+            for src in self.src:
+                if regex.match(src['name']):
+                    dep_srcs[dep] = src
+                    break
+
+        return dep_srcs
+
+    def extract_step(self):
+        """Extract sources, except for source tarballs of dependencies that should be 'downloaded' by PETSc."""
+        dep_srcs = self.det_download_dep_sources().values()
+        if dep_srcs:
+            all_srcs = self.src
+            self.src = [src for src in all_srcs if src not in dep_srcs]
+            try:
+                super(EB_PETSc, self).extract_step()
+            finally:
+                self.src = all_srcs
+        else:
+            super(EB_PETSc, self).extract_step()
+
     def prepare_step(self, *args, **kwargs):
         """Prepare build environment."""
 
@@ -115,8 +151,14 @@ class EB_PETSc(ConfigureMake):
                 self.log.info("Creating the installation directory before the configure.")
                 self.make_installdir()
                 self.cfg["keeppreviousinstall"] = True
-                for dep in set(deps):
-                    self.cfg.update('configopts', '--download-%s=1' % dep)
+                dep_srcs = self.det_download_dep_sources()
+                for dep in sorted(set(deps)):
+                    if dep in dep_srcs:
+                        self.log.info("Using source tarball %s for dependency %s", dep_srcs[dep]['path'], dep)
+                        self.cfg.update('configopts', '--download-%s=%s' % (dep, dep_srcs[dep]['path']))
+                    else:
+                        self.log.info("No source tarball found for dependency %s, will be downloaded by PETSc", dep)
+                        self.cfg.update('configopts', '--download-%s=1' % dep)
                 for dep in self.cfg["download_deps_static"]:
                     self.cfg.update('configopts', '--download-%s-shared=0' % dep)
                 for dep in self.cfg["download_deps_shared"]:
@@ -33,9 +33,12 @@ import re
 from distutils.version import LooseVersion
 
 import easybuild.tools.environment as env
+from easybuild.base import fancylogger
 from easybuild.easyblocks.generic.configuremake import ConfigureMake
+from easybuild.framework.easyconfig import CUSTOM
 from easybuild.tools.build_log import print_warning
 from easybuild.tools.modules import get_software_root
+from easybuild.tools.run import run_cmd
 from easybuild.tools.systemtools import get_shared_lib_ext
 
 
@@ -49,6 +52,30 @@ class EB_R(ConfigureMake):
     or latest library version (in that order of preference)
     """
 
+    @staticmethod
+    def extra_options():
+        """Extra easyconfig parameters specific to R."""
+        extra_vars = {
+            'batch_install': [False, "Install R packages that are installed as extensions in batches, "
+                                     "using a single R session per batch (in parallel, based on 'parallel')", CUSTOM],
+        }
+        return ConfigureMake.extra_options(extra_vars)
+
+    def __init__(self, *args, **kwargs):
+        """Initialize R-specific class variables."""
+        super(EB_R, self).__init__(*args, **kwargs)
+
+        self.r_home = None
+        self.r_pkgs_batch = None
+        self.r_pkgs_load_results = None
+
+    def get_r_home(self):
+        """Determine R home directory (result is cached, since it is used for every R package extension)."""
+        if self.r_home is None:
+            (out, _) = run_cmd("R RHOME", log_all=True, simple=False)
+            self.r_home = out.strip()
+        return self.r_home
+
     def prepare_for_extensions(self):
         """
         We set some default configs here for R packages
@@ -139,3 +166,55 @@ class EB_R(ConfigureMake):
             'dirs': [],
         }
         super(EB_R, self).sanity_check_step(custom_paths=custom_paths)
+
+
+def get_r_pkgs_load_results(pkg_names, batch_size=20):
+    """
+    Check whether specified R packages can be loaded, equivalent to running library(<name>) for each of them,
+    using one R session per batch of R packages rather than a separate R session per R package.
+    R packages that failed to load in a batch (or for which no result was reported) are checked again
+    in a separate R session, since loading many R packages in a single R session may fail for reasons
+    that are unrelated to the R package itself (for example hitting the maximum number of loaded DLLs).
+
+    :param pkg_names: list of names of R packages
+    :param batch_size: maximum number of R packages to load in a single R session
+    :return: dict with (success, load time in seconds, error message) tuple for each R package;
+             R packages for which no result was reported are not included
+    """
+    log = fancylogger.getLogger('get_r_pkgs_load_results', fname=False)
+
+    r_cmd_tmpl = '\n'.join([
+        'for (pkg in c(%s)) {',
+        '    t0 <- proc.time()[["elapsed"]]',
+        '    msg <- tryCatch({suppressPackageStartupMessages(library(pkg, character.only=TRUE)); ""},',
+        '                    error=function(e) gsub("[\\r\\n]+", " ", conditionMessage(e)))',
+        '    status <- if (msg == "") "OK" else "FAILED"',
+        '    t <- sprintf("%%.3f", proc.time()[["elapsed"]] - t0)',
+        '    cat("EB_LOAD_RESULT", pkg, status, t, msg, "\\n")',
+        '}',
+    ])
+    result_regex = re.compile(r'^EB_LOAD_RESULT (\S+) (OK|FAILED) ([0-9.]+) ?(.*)$', re.M)
+
+    def load_r_pkgs(batch):
+        """Check loading of specified R packages in a single R session."""
+        r_cmd = r_cmd_tmpl % ', '.join('"%s"' % x for x in batch)
+        (out, ec) = run_cmd("R -q --no-save", inp=r_cmd, log_ok=False, simple=False, regexp=False)
+        if ec:
+            log.warning("R command to check loading of R packages %s failed: %s", ', '.join(batch), out)
+
+        return dict((name, (status == 'OK', float(load_time), msg.strip()))
+                    for (name, status, load_time, msg) in result_regex.findall(out))
+
+    res = {}
+    for idx in range(0, len(pkg_names), batch_size):
+        batch = pkg_names[idx:idx + batch_size]
+        batch_res = load_r_pkgs(batch)
+        res.update(batch_res)
+
+        if len(batch) > 1:
+            for name in batch:
+                if not batch_res.get(name, (False,))[0]:
+                    log.info("Checking loading of R package %s again in a separate R session", name)
+                    res.update(load_r_pkgs([name]))
+
+    return res
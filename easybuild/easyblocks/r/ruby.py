@@ -29,6 +29,7 @@ EasyBuild support for Ruby, implemented as an easyblock
 """
 
 from easybuild.easyblocks.generic.configuremake import ConfigureMake
+from easybuild.framework.easyconfig import CUSTOM
 from easybuild.tools.systemtools import get_shared_lib_ext
 
 
@@ -39,6 +40,21 @@ EXTS_FILTER_GEMS = ("gem list '^%(ext_name)s$' -i", "")
 class EB_Ruby(ConfigureMake):
     """Building and installing Ruby including support for gems"""
 
+    @staticmethod
+    def extra_options():
+        """Extra easyconfig parameters specific to Ruby."""
+        extra_vars = {
+            'batch_install': [False, "Install Ruby gems that are installed as extensions with a single "
+                                     "'gem install' command", CUSTOM],
+        }
+        return ConfigureMake.extra_options(extra_vars)
+
+    def __init__(self, *args, **kwargs):
+        """Initialize Ruby-specific class variables."""
+        super(EB_Ruby, self).__init__(*args, **kwargs)
+
+        self.ruby_gems_batch = None
+
     def prepare_for_extensions(self):
         """Sets default class and filter for gems"""
         self.cfg['exts_defaultclass'] = 'RubyGem'
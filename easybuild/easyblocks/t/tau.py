@@ -30,14 +30,17 @@ EasyBuild support for building and installing TAU, implemented as an easyblock
 @author Bernd Mohr (Juelich Supercomputing Centre)
 """
 import os
+import time
+from multiprocessing.pool import ThreadPool
 
 from easybuild.easyblocks.generic.configuremake import ConfigureMake
 from easybuild.easyblocks.pdt import find_arch_dir
 from easybuild.framework.easyconfig import CUSTOM
 from easybuild.tools import toolchain
 from easybuild.tools.build_log import EasyBuildError, print_msg
-from easybuild.tools.filetools import symlink
+from easybuild.tools.filetools import change_dir, copy_dir, symlink
 from easybuild.tools.modules import get_software_root, get_software_version
+from easybuild.tools.run import run_cmd
 from easybuild.tools.systemtools import get_shared_lib_ext
 
 
@@ -57,6 +60,8 @@ class EB_TAU(ConfigureMake):
         backends = "Extra TAU backends to build and install; possible values: %s" % ','.join(sorted(KNOWN_BACKENDS))
         extra_vars = {
             'extra_backends': [None, backends, CUSTOM],
+            'parallel_variants': [False, "Build TAU variants concurrently, each in a separate copy of the source tree",
+                                  CUSTOM],
             'tau_makefile': ['Makefile.tau-papi-mpi-pdt', "Name of Makefile to use in $TAU_MAKEFILE", CUSTOM],
         }
         return ConfigureMake.extra_options(extra_vars)
@@ -70,6 +75,8 @@ class EB_TAU(ConfigureMake):
         self.mpi_inc_dir, self.mpi_lib_dir = None, None
         self.opt_pkgs_opts = None
         self.variant_labels = None
+        # list of (label, configure options, build directory) for variants that are built concurrently
+        self.variant_builds = []
 
     def run_all_steps(self, *args, **kwargs):
         """
@@ -112,8 +119,14 @@ class EB_TAU(ConfigureMake):
         if self.cfg['configopts']:
             raise EasyBuildError("Specifying additional configure options for TAU is not supported (yet)")
 
-        self.cfg['configopts'] = [mpi_tmpl, openmp_tmpl, hybrid_tmpl] * iter_cnt
-        self.log.debug("List of configure options to iterate over: %s", self.cfg['configopts'])
+        variant_configopts = [mpi_tmpl, openmp_tmpl, hybrid_tmpl] * iter_cnt
+        if self.cfg['parallel_variants']:
+            # all variants are handled in a single iteration, see configure_step
+            self.variant_builds = [(None, x, None) for x in variant_configopts]
+            self.cfg['configopts'] = ''
+        else:
+            self.cfg['configopts'] = variant_configopts
+            self.log.debug("List of configure options to iterate over: %s", self.cfg['configopts'])
 
         # custom prefix option for configure command
         self.cfg['prefix_opt'] = '-prefix='
@@ -201,6 +214,35 @@ class EB_TAU(ConfigureMake):
             raise EasyBuildError("Specified tau_makefile %s will not be available (only: %s)",
                                  self.cfg['tau_makefile'], avail_makefiles)
 
+        # Configure creates required subfolders in installdir, so create first (but only once, during first iteration)
+        if self.iter_idx == 0:
+            super(EB_TAU, self).make_installdir()
+
+        if self.variant_builds:
+            # configure each variant in a separate copy of the source tree;
+            # configuring is done one variant at a time, since it also touches the installation directory
+            start_dir = self.cfg['start_dir']
+            for idx, (_, configopts_tmpl, _) in enumerate(self.variant_builds):
+                variant_dir = os.path.join(self.builddir, 'easybuild_variant_%d' % idx)
+                copy_dir(start_dir, variant_dir, symlinks=True)
+                if not self.dry_run:
+                    change_dir(variant_dir)
+
+                self.cfg['configopts'] = configopts_tmpl
+                start_time = time.time()
+                label = self.configure_variant()
+                self.log.info("Configuring TAU for %s took %.1f seconds", label, time.time() - start_time)
+
+                self.variant_builds[idx] = (label, self.cfg['configopts'], variant_dir)
+
+            self.cfg['configopts'] = ''
+            if not self.dry_run:
+                change_dir(start_dir)
+        else:
+            self.configure_variant()
+
+    def configure_variant(self):
+        """Configure current TAU variant, using configure options template in 'configopts'."""
         # inform which backend/variant is being handled
         backend = (['tau'] + self.cfg['extra_backends'])[self.variant_index // 3]
         variant = ['mpi', 'openmp', 'hybrid'][self.variant_index % 3]
@@ -219,21 +261,68 @@ class EB_TAU(ConfigureMake):
         for key in ['preconfigopts', 'configopts', 'prebuildopts', 'preinstallopts']:
             self.log.debug("%s for TAU (variant index: %s): %s", key, self.variant_index, self.cfg[key])
 
-        # Configure creates required subfolders in installdir, so create first (but only once, during first iteration)
-        if self.iter_idx == 0:
-            super(EB_TAU, self).make_installdir()
-
         super(EB_TAU, self).configure_step()
 
         self.variant_index += 1
 
+        return '%s backend (%s variant)' % (backend, variant)
+
     def build_step(self):
-        """No custom build procedure for TAU."""
-        pass
+        """
+        No custom build procedure for TAU, building is done by 'make install';
+        except when building variants concurrently: then all variants are built at the same time,
+        with the available cores split between them.
+        """
+        if not self.variant_builds:
+            return
+
+        parallel = max(1, (self.cfg['parallel'] or 1) // len(self.variant_builds))
+
+        def build_variant(variant_build):
+            """Build specified TAU variant, return label, time it took and error (if any)."""
+            label, _, variant_dir = variant_build
+            cmd = "cd %s && %s make -j %d %s" % (variant_dir, self.cfg['prebuildopts'], parallel,
+                                                 self.cfg['buildopts'])
+            start_time = time.time()
+            try:
+                run_cmd(cmd, log_all=True, simple=True)
+            except EasyBuildError as err:
+                return (label, time.time() - start_time, err)
+            return (label, time.time() - start_time, None)
+
+        self.log.info("Building %d TAU variants concurrently (using %d cores each)", len(self.variant_builds), parallel)
+        if self.dry_run:
+            results = [build_variant(x) for x in self.variant_builds]
+        else:
+            pool = ThreadPool(processes=len(self.variant_builds))
+            try:
+                results = pool.map(build_variant, self.variant_builds)
+            finally:
+                pool.close()
+                pool.join()
+
+        errors = []
+        for label, build_time, err in results:
+            if err is None:
+                self.log.info("Building TAU for %s took %.1f seconds", label, build_time)
+            else:
+                errors.append("%s: %s" % (label, err))
+
+        if errors:
+            raise EasyBuildError("Failed to build one or more TAU variants:\n%s", '\n'.join(errors))
 
     def install_step(self):
-        """Create symlinks into arch-specific directories"""
-        super(EB_TAU, self).install_step()
+        """Install TAU (one variant at a time), and create symlinks into arch-specific directories"""
+        if self.variant_builds:
+            for label, _, variant_dir in self.variant_builds:
+                if not self.dry_run:
+                    change_dir(variant_dir)
+                start_time = time.time()
+                super(EB_TAU, self).install_step()
+                self.log.info("Installing TAU for %s took %.1f seconds", label, time.time() - start_time)
+        else:
+            super(EB_TAU, self).install_step()
+
         # Link arch-specific directories into prefix
         arch_dir = find_arch_dir(self.installdir)
         self.log.info('Found %s as architecture specific directory. Creating symlinks...', arch_dir)
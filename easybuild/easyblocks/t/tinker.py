@@ -29,19 +29,56 @@ EasyBuild support for building and installing TINKER, implemented as an easybloc
 """
 import glob
 import os
+import re
 import tempfile
-
+import time
 from distutils.version import LooseVersion
+from multiprocessing.pool import ThreadPool
 
 import easybuild.tools.toolchain as toolchain
+from easybuild.base import fancylogger
 from easybuild.framework.easyblock import EasyBlock
 from easybuild.tools.build_log import EasyBuildError
-from easybuild.tools.filetools import apply_regex_substitutions, change_dir, copy_dir, copy_file, mkdir
+from easybuild.tools.filetools import apply_regex_substitutions, change_dir, copy_dir, copy_file, mkdir, read_file
 from easybuild.tools.modules import get_software_root
 from easybuild.tools.run import run_cmd
 from easybuild.tools.systemtools import DARWIN, LINUX, get_os_type
 
 
+def parse_compile_script(path, srcdir):
+    """
+    Parse TINKER compile script (compile.make) at specified path: one compile command per source file.
+
+    :param path: path to compile script
+    :param srcdir: directory in which compile commands are run (where source files are located)
+    :return: list of (compile command, Fortran modules defined, Fortran modules used) tuples, in order of script;
+             None if the script contains lines that are not recognised as a compile command for a single source file
+    """
+    log = fancylogger.getLogger('parse_compile_script', fname=False)
+
+    compile_cmd_regex = re.compile(r'^\S+\s.*\s(?P<src>[\w.-]+\.(f|f90|F|F90|c|cpp))$')
+    module_def_regex = re.compile(r'^\s*module\s+(\w+)\s*$', re.I | re.M)
+    module_use_regex = re.compile(r'^\s+use\s+(\w+)', re.I | re.M)
+
+    compile_cmds = []
+    for line in read_file(path).splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+
+        res = compile_cmd_regex.match(line)
+        if res is None:
+            log.info("Line '%s' in %s is not a compile command for a single source file", line, path)
+            return None
+
+        src_txt = read_file(os.path.join(srcdir, res.group('src')))
+        defs = set(x.lower() for x in module_def_regex.findall(src_txt))
+        uses = set(x.lower() for x in module_use_regex.findall(src_txt)) - defs
+        compile_cmds.append((line, defs, uses))
+
+    return compile_cmds
+
+
 class EB_TINKER(EasyBlock):
     """Support for building/installing TINKER."""
 
@@ -95,12 +132,83 @@ class EB_TINKER(EasyBlock):
     def build_step(self):
         """Custom build procedure for TINKER."""
 
-        change_dir(os.path.join(self.cfg['start_dir'], 'source'))
+        srcdir = os.path.join(self.cfg['start_dir'], 'source')
+        change_dir(srcdir)
+
+        compile_script = os.path.join(self.cfg['start_dir'], self.build_subdir, 'compile.make')
+        compile_cmds = None
+        if (self.cfg['parallel'] or 1) > 1 and not self.dry_run:
+            compile_cmds = parse_compile_script(compile_script, srcdir)
+
+        if compile_cmds:
+            self.compile_concurrently(compile_cmds, srcdir)
+        else:
+            run_cmd(compile_script)
 
-        run_cmd(os.path.join(self.cfg['start_dir'], self.build_subdir, 'compile.make'))
         run_cmd(os.path.join(self.cfg['start_dir'], self.build_subdir, 'library.make'))
         run_cmd(os.path.join(self.cfg['start_dir'], self.build_subdir, 'link.make'))
 
+    def compile_concurrently(self, compile_cmds, srcdir):
+        """
+        Run compile commands (as obtained from compile.make) concurrently in specified directory,
+        taking into account that source files that use a Fortran module can only be compiled
+        after the source file that defines that module.
+        """
+        max_workers = self.cfg['parallel']
+        self.log.info("Compiling %d TINKER source files using %d workers", len(compile_cmds), max_workers)
+
+        # only take into account modules that are defined in one of the source files (not e.g. omp_lib)
+        all_defs = set()
+        for (_, defs, _) in compile_cmds:
+            all_defs.update(defs)
+
+        def run_compile_cmd(cmd):
+            """Run compile command, return error (if any)."""
+            try:
+                run_cmd("cd %s && %s" % (srcdir, cmd), log_all=True, simple=True)
+            except EasyBuildError as err:
+                return err
+            return None
+
+        start_time = time.time()
+        pending, running, done_defs, errors = compile_cmds[:], [], set(), []
+        pool = ThreadPool(processes=max_workers)
+        try:
+            while (pending and not errors) or running:
+                # start compile commands for which all required modules are available, in order of compile script
+                for item in pending[:]:
+                    if len(running) >= max_workers:
+                        break
+                    (cmd, _, uses) = item
+                    if (uses & all_defs) <= done_defs:
+                        pending.remove(item)
+                        running.append((item, pool.apply_async(run_compile_cmd, (cmd,))))
+
+                if not running:
+                    raise EasyBuildError("Failed to determine compile order for TINKER, modules not provided: %s",
+                                         ', '.join(sorted(set.union(*[x[2] for x in pending]) - done_defs)))
+
+                # wait for (at least) one compile command to finish
+                while running and not any(res.ready() for (_, res) in running):
+                    time.sleep(0.1)
+
+                for entry in [x for x in running if x[1].ready()]:
+                    running.remove(entry)
+                    ((cmd, defs, _), res) = entry
+                    err = res.get()
+                    if err is None:
+                        done_defs.update(defs)
+                    else:
+                        errors.append("%s: %s" % (cmd, err))
+        finally:
+            pool.close()
+            pool.join()
+
+        if errors:
+            raise EasyBuildError("Failed to compile TINKER:\n%s", '\n'.join(errors))
+
+        self.log.info("Compiling TINKER source files took %.1f seconds", time.time() - start_time)
+
     def test_step(self):
         """Custom built-in test procedure for TINKER."""
         if self.cfg['runtest']:
@@ -118,7 +226,7 @@ class EB_TINKER(EasyBlock):
             change_dir(testdir)
 
             # run all tests via the provided 'run' scripts
-            tests = glob.glob(os.path.join(testdir, '*.run'))
+            tests = sorted(glob.glob(os.path.join(testdir, '*.run')))
 
             # gpcr takes too long (~1h)
             skip_tests = ['gpcr']
@@ -131,8 +239,51 @@ class EB_TINKER(EasyBlock):
 
             tests = [t for t in tests if not any([t.endswith('%s.run' % x) for x in skip_tests])]
 
-            for test in tests:
-                run_cmd(test)
+            max_workers = min(self.cfg['parallel'] or 1, len(tests))
+            if max_workers > 1:
+                self.run_tests_concurrently(tests, tmpdir, max_workers)
+            else:
+                for test in tests:
+                    run_cmd(test)
+
+    def run_tests_concurrently(self, tests, tmpdir, max_workers):
+        """
+        Run specified tests concurrently, each in its own copy of the test directory
+        (next to the 'bin' and 'params' directories, which are used via relative paths in the test scripts).
+        """
+        testdir = os.path.join(tmpdir, 'test')
+
+        def run_test(test):
+            """Run specified test in dedicated working directory, return test name, runtime and error (if any)."""
+            name = os.path.basename(test)[:-len('.run')]
+            workdir = os.path.join(tmpdir, 'test_%s' % name)
+            start_time = time.time()
+            try:
+                copy_dir(testdir, workdir)
+                # use a single OpenMP thread per test, since tests are running concurrently
+                run_cmd("cd %s && export OMP_NUM_THREADS=1 && ./%s" % (workdir, os.path.basename(test)),
+                        log_all=True, simple=True)
+            except EasyBuildError as err:
+                return (name, time.time() - start_time, err)
+            return (name, time.time() - start_time, None)
+
+        self.log.info("Running %d TINKER tests using %d workers", len(tests), max_workers)
+        pool = ThreadPool(processes=max_workers)
+        try:
+            results = pool.map(run_test, tests)
+        finally:
+            pool.close()
+            pool.join()
+
+        errors = []
+        for (name, runtime, err) in sorted(results, key=lambda x: -x[1]):
+            if err is None:
+                self.log.info("TINKER test %s took %.1f seconds", name, runtime)
+            else:
+                errors.append("%s: %s" % (name, err))
+
+        if errors:
+            raise EasyBuildError("One or more TINKER tests failed:\n%s", '\n'.join(errors))
 
     def install_step(self):
         """Custom install procedure for TINKER."""
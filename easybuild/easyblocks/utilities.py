@@ -0,0 +1,395 @@
+##
+# Copyright 2021 Ghent University
+#
+# This file is part of EasyBuild,
+# originally created by the HPC team of Ghent University (http://ugent.be/hpc/en),
+# with support of Ghent University (http://ugent.be/hpc),
+# the Flemish Supercomputer Centre (VSC) (https://www.vscentrum.be),
+# Flemish Research Foundation (FWO) (http://www.fwo.be/en)
+# and the Department of Economy, Science and Innovation (EWI) (http://www.ewi-vlaanderen.be/en).
+#
+# https://github.com/easybuilders/easybuild
+#
+# EasyBuild is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation v2.
+#
+# EasyBuild is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with EasyBuild.  If not, see <http://www.gnu.org/licenses/>.
+##
+"""
+Utility functions that are shared between easyblocks.
+"""
+import json
+import multiprocessing
+import os
+import re
+import threading
+import time
+
+from easybuild.base import fancylogger
+from easybuild.framework.easyconfig import CUSTOM
+from easybuild.tools.build_log import EasyBuildError, print_msg, print_warning
+from easybuild.tools.config import log_path
+from easybuild.tools.filetools import read_file, write_file
+from easybuild.tools.hooks import BUILD_STEP, CONFIGURE_STEP, INSTALL_STEP, TEST_STEP
+from easybuild.tools.run import run_cmd
+
+
+# steps for which resource usage is monitored when 'monitor_steps' is enabled
+MONITORED_STEPS = [CONFIGURE_STEP, BUILD_STEP, TEST_STEP, INSTALL_STEP]
+# name of file in which resource usage for monitored steps is stored (in JSON format),
+# in same subdirectory of installation directory as (copy of) build log
+STEP_RESOURCE_USAGE_FILENAME = 'step_resource_usage.json'
+
+# results reported by Automake test harness that indicate a problem
+AUTOMAKE_TEST_FAILURES = ['ERROR', 'FAIL', 'XPASS']
+
+
+def get_fork_context():
+    """
+    Return multiprocessing context to use for creating worker processes that run easyblock steps,
+    which always uses the 'fork' start method regardless of the default start method:
+    worker processes must inherit the state of the EasyBuild session (configuration, environment,
+    easyblock instances), which can not be passed to a worker process that is started via 'spawn'.
+    """
+    if hasattr(multiprocessing, 'get_context'):
+        return multiprocessing.get_context('fork')
+    else:
+        # Python 2 has no support for start methods, worker processes are always created via fork
+        return multiprocessing
+
+
+def get_proc_tree_rss(pid=None):
+    """
+    Determine total resident set size (in bytes) of specified process (default: current process)
+    and all its descendant processes, based on /proc (so only supported on Linux).
+    """
+    if pid is None:
+        pid = os.getpid()
+
+    # collect parent PID and RSS (in pages) of all processes
+    children, rss_pages = {}, {}
+    for proc_pid in os.listdir('/proc'):
+        if proc_pid.isdigit():
+            try:
+                with open(os.path.join('/proc', proc_pid, 'stat')) as fp:
+                    stat_txt = fp.read()
+            except (IOError, OSError):
+                # process may have finished already
+                continue
+            # skip process name (in between parentheses, may include spaces), see 'man 5 proc'
+            fields = stat_txt[stat_txt.rfind(')') + 2:].split()
+            children.setdefault(int(fields[1]), []).append(int(proc_pid))
+            rss_pages[int(proc_pid)] = int(fields[21])
+
+    total_pages, todo = 0, [pid]
+    while todo:
+        proc_pid = todo.pop()
+        total_pages += rss_pages.get(proc_pid, 0)
+        todo.extend(children.get(proc_pid, []))
+
+    return total_pages * os.sysconf('SC_PAGE_SIZE')
+
+
+def run_with_resource_monitor(func, usage, interval=1.0):
+    """
+    Run specified function, while monitoring resource usage of the current process and all its subprocesses.
+
+    :param func: function to run (without arguments)
+    :param usage: dict to store resource usage in (also when running the function fails):
+                  wall time and CPU time (in seconds), and peak resident set size (in bytes)
+    :param interval: time (in seconds) between samples of resident set size
+    :return: result of function
+    """
+    stop = threading.Event()
+    usage['peak_rss'] = get_proc_tree_rss()
+
+    def sample_rss():
+        """Sample resident set size of process tree until monitoring is stopped."""
+        while not stop.wait(interval):
+            usage['peak_rss'] = max(usage['peak_rss'], get_proc_tree_rss())
+
+    sampler = threading.Thread(target=sample_rss)
+    sampler.daemon = True
+
+    start_time, start_cpu_times = time.time(), os.times()
+    sampler.start()
+    try:
+        return func()
+    finally:
+        stop.set()
+        sampler.join()
+        # CPU time includes both current process and subprocesses that have finished (user + system time)
+        usage['cpu_time'] = sum(os.times()[:4]) - sum(start_cpu_times[:4])
+        usage['wall_time'] = time.time() - start_time
+
+
+def monitor_steps_extra_options():
+    """Return custom easyconfig parameters to control monitoring of resource usage of steps."""
+    return {
+        'monitor_steps': [False, "Monitor resource usage (wall time, CPU time, peak RSS) of configure, build, "
+                                 "test and install steps", CUSTOM],
+    }
+
+
+class MonitoredStepsMixin(object):
+    """
+    Mixin class for easyblocks, to monitor resource usage of configure/build/test/install steps
+    if 'monitor_steps' is enabled (see monitor_steps_extra_options).
+    """
+
+    def run_step(self, step, step_methods):
+        """Run step, and monitor resource usage for it if 'monitor_steps' is enabled."""
+        run_step = super(MonitoredStepsMixin, self).run_step
+
+        if not self.cfg.get('monitor_steps') or step not in MONITORED_STEPS or self.dry_run:
+            return run_step(step, step_methods)
+
+        usage = {}
+        try:
+            return run_with_resource_monitor(lambda: run_step(step, step_methods), usage)
+        finally:
+            self.log.info("Resource usage for %s step: wall time %.1f sec, CPU time %.1f sec, peak RSS %.1f MiB",
+                          step, usage['wall_time'], usage['cpu_time'], usage['peak_rss'] / (1024.0 * 1024))
+
+            if not hasattr(self, 'step_resource_usage'):
+                self.step_resource_usage = {}
+            self.step_resource_usage[step] = usage
+
+            # (re)write summary of resource usage for monitored steps, if installation directory is already there
+            if os.path.isdir(self.installdir):
+                path = os.path.join(self.installdir, log_path(ec=self.cfg), STEP_RESOURCE_USAGE_FILENAME)
+                write_file(path, json.dumps(self.step_resource_usage, indent=4, sort_keys=True))
+
+
+def run_with_test_log_watcher(func, path, test_times, interval=1.0):
+    """
+    Run specified function, while keeping track of when log (.log) and result (.trs) files produced by
+    the Automake test harness for individual tests appear in specified directory
+    (Automake does not record how long each test took).
+
+    :param func: function to run (without arguments)
+    :param path: directory to watch for test log/result files
+    :param test_times: dict to store time at which each (new or updated) test log/result file was first seen in
+    :param interval: time (in seconds) between scans of specified directory
+    :return: result of function
+    """
+    stop = threading.Event()
+    start_time = time.time()
+
+    def scan():
+        """Scan for new test log/result files."""
+        now = time.time()
+        for (dirpath, _, filenames) in os.walk(path):
+            for filename in filenames:
+                filepath = os.path.join(dirpath, filename)
+                if filename.endswith(('.log', '.trs')) and filepath not in test_times:
+                    try:
+                        # ignore files left behind by an earlier test run
+                        if os.path.getmtime(filepath) >= int(start_time):
+                            test_times[filepath] = now
+                    except OSError:
+                        continue
+
+    def watch():
+        """Scan for test log/result files until watching is stopped."""
+        while not stop.wait(interval):
+            scan()
+
+    watcher = threading.Thread(target=watch)
+    watcher.daemon = True
+    watcher.start()
+    try:
+        return func()
+    finally:
+        stop.set()
+        watcher.join()
+        # final scan, to also pick up results for tests that finished after last scan
+        scan()
+
+
+def parse_automake_test_results(path, test_times=None):
+    """
+    Parse results for individual tests from .trs files produced by Automake test harness in specified directory.
+
+    :param path: directory to search for .trs files
+    :param test_times: dict with time at which test log/result files were first seen (see run_with_test_log_watcher),
+                       used to determine duration of each test
+    :return: list of (test name, result, duration) tuples, duration is None if unknown
+    """
+    log = fancylogger.getLogger('parse_automake_test_results', fname=False)
+
+    if test_times is None:
+        test_times = {}
+
+    global_result_regex = re.compile(r'^:global-test-result:\s*(\S+)', re.M)
+    result_regex = re.compile(r'^:test-result:\s*(\S+)', re.M)
+
+    results = []
+    for (dirpath, _, filenames) in os.walk(path):
+        for filename in sorted(filenames):
+            if not filename.endswith('.trs'):
+                continue
+
+            trs_path = os.path.join(dirpath, filename)
+            txt = read_file(trs_path)
+            res = global_result_regex.search(txt)
+            if res:
+                result = res.group(1)
+            else:
+                # a single test script may report multiple results (e.g. with TAP), so report first problem (if any)
+                test_results = result_regex.findall(txt) or ['UNKNOWN']
+                result = ([x for x in test_results if x in AUTOMAKE_TEST_FAILURES] + test_results)[0]
+
+            log_path_ = trs_path[:-len('.trs')] + '.log'
+            duration = None
+            if trs_path in test_times and log_path_ in test_times:
+                duration = test_times[trs_path] - test_times[log_path_]
+
+            test_name = os.path.relpath(trs_path, path)[:-len('.trs')]
+            results.append((test_name, result, duration))
+
+    log.debug("Test results found in %s: %s", path, results)
+
+    return sorted(results)
+
+
+def parse_automake_test_suite_logs(path):
+    """
+    Parse summary of test results from test-suite.log files produced by Automake test harness in specified directory.
+
+    :return: dict with test-suite.log paths (relative to specified directory) as keys,
+             and dicts with number of tests per result (TOTAL, PASS, SKIP, ...) as values
+    """
+    summary_regex = re.compile(r'^#\s*(TOTAL|PASS|SKIP|XFAIL|FAIL|XPASS|ERROR):\s*([0-9]+)', re.M)
+
+    summaries = {}
+    for (dirpath, _, filenames) in os.walk(path):
+        if 'test-suite.log' in filenames:
+            test_suite_log = os.path.join(dirpath, 'test-suite.log')
+            counts = dict((key, int(val)) for (key, val) in summary_regex.findall(read_file(test_suite_log)))
+            summaries[os.path.relpath(test_suite_log, path)] = counts
+
+    return summaries
+
+
+# small two-rank ping-pong program, reports latency for small messages and bandwidth for large messages
+MPI_PINGPONG_SRC = r"""
+#include <mpi.h>
+#include <stdio.h>
+#include <stdlib.h>
+
+static double pingpong(int rank, char *buf, int size, int iters) {
+    int i;
+    double start = 0.0;
+    for (i = -10; i < iters; i++) {
+        /* first few iterations are warmup */
+        if (i == 0) {
+            MPI_Barrier(MPI_COMM_WORLD);
+            start = MPI_Wtime();
+        }
+        if (rank == 0) {
+            MPI_Send(buf, size, MPI_CHAR, 1, 0, MPI_COMM_WORLD);
+            MPI_Recv(buf, size, MPI_CHAR, 1, 0, MPI_COMM_WORLD, MPI_STATUS_IGNORE);
+        } else if (rank == 1) {
+            MPI_Recv(buf, size, MPI_CHAR, 0, 0, MPI_COMM_WORLD, MPI_STATUS_IGNORE);
+            MPI_Send(buf, size, MPI_CHAR, 0, 0, MPI_COMM_WORLD);
+        }
+    }
+    return MPI_Wtime() - start;
+}
+
+int main(int argc, char **argv) {
+    int rank, nranks;
+    int large = 4 * 1024 * 1024;
+    char *buf;
+    double latency, bandwidth;
+
+    MPI_Init(&argc, &argv);
+    MPI_Comm_rank(MPI_COMM_WORLD, &rank);
+    MPI_Comm_size(MPI_COMM_WORLD, &nranks);
+    if (nranks != 2) {
+        fprintf(stderr, "ping-pong test requires exactly 2 ranks, found %d\n", nranks);
+        MPI_Abort(MPI_COMM_WORLD, 1);
+    }
+    buf = calloc(large, 1);
+
+    /* one-way latency for 8-byte messages, in microseconds */
+    latency = pingpong(rank, buf, 8, 10000) / 10000 / 2 * 1e6;
+    /* bandwidth for 4MiB messages, in MB/s */
+    bandwidth = 2.0 * 100 * large / pingpong(rank, buf, large, 100) / 1e6;
+
+    if (rank == 0) {
+        printf("PINGPONG latency_us=%.3f bandwidth_MBs=%.1f\n", latency, bandwidth);
+    }
+    free(buf);
+    MPI_Finalize();
+    return 0;
+}
+"""
+
+
+def mpi_pingpong_extra_options():
+    """Return custom easyconfig parameters to control the MPI ping-pong check."""
+    return {
+        'mpi_pingpong_check': [False, "Run two-rank ping-pong test on local node (shared memory only) "
+                                      "after installation", CUSTOM],
+        'mpi_pingpong_fail': [True, "Fail if ping-pong test results are worse than specified thresholds "
+                                    "(if False, only print a warning)", CUSTOM],
+        'mpi_pingpong_max_latency': [None, "Maximum latency (in microseconds) for small messages "
+                                           "in ping-pong test", CUSTOM],
+        'mpi_pingpong_min_bandwidth': [None, "Minimum bandwidth (in MB/s) for large messages in ping-pong test",
+                                       CUSTOM],
+    }
+
+
+def run_mpi_pingpong_check(workdir, mpi_cmd_tmpl, compiler='mpicc', max_latency=None, min_bandwidth=None,
+                           fail=True):
+    """
+    Compile and run two-rank ping-pong test on local node, and check measured latency and bandwidth.
+
+    :param workdir: directory to build and run ping-pong test program in
+    :param mpi_cmd_tmpl: template for command to run ping-pong test with 2 ranks (with '%(cmd)s' placeholder),
+                         should ensure that only shared memory is used for communication
+    :param compiler: MPI compiler wrapper to use
+    :param max_latency: maximum latency (in microseconds)
+    :param min_bandwidth: minimum bandwidth (in MB/s)
+    :param fail: raise an error if results are worse than the thresholds (if False, only print a warning)
+    :return: (latency, bandwidth) tuple
+    """
+    log = fancylogger.getLogger('run_mpi_pingpong_check', fname=False)
+
+    src = os.path.join(workdir, 'mpi_pingpong.c')
+    exe = os.path.join(workdir, 'mpi_pingpong')
+    write_file(src, MPI_PINGPONG_SRC)
+
+    run_cmd("%s %s -o %s" % (compiler, src, exe), log_all=True, simple=True)
+    out, _ = run_cmd(mpi_cmd_tmpl % {'cmd': exe}, log_all=True, simple=False)
+
+    res = re.search(r"^PINGPONG latency_us=(?P<latency>[0-9.]+) bandwidth_MBs=(?P<bandwidth>[0-9.]+)", out, re.M)
+    if not res:
+        raise EasyBuildError("Failed to determine ping-pong test results from output: %s", out)
+
+    latency, bandwidth = float(res.group('latency')), float(res.group('bandwidth'))
+    msg = "MPI ping-pong test (2 ranks, shared memory): latency %.2f us, bandwidth %.1f MB/s" % (latency, bandwidth)
+    print_msg(msg, log=log)
+
+    issues = []
+    if max_latency is not None and latency > max_latency:
+        issues.append("latency %.2f us is above maximum of %s us" % (latency, max_latency))
+    if min_bandwidth is not None and bandwidth < min_bandwidth:
+        issues.append("bandwidth %.1f MB/s is below minimum of %s MB/s" % (bandwidth, min_bandwidth))
+
+    if issues:
+        if fail:
+            raise EasyBuildError("MPI ping-pong test results are not acceptable: %s", ', '.join(issues))
+        else:
+            print_warning("MPI ping-pong test results are not acceptable: %s" % ', '.join(issues))
+
+    return latency, bandwidth
@@ -34,6 +34,7 @@ EasyBuild support for building and installing WPS, implemented as an easyblock
 """
 import os
 import re
+import stat
 import tempfile
 from distutils.version import LooseVersion
 
@@ -45,12 +46,44 @@ from easybuild.framework.easyblock import EasyBlock
 from easybuild.framework.easyconfig import CUSTOM, MANDATORY
 from easybuild.tools.build_log import EasyBuildError
 from easybuild.tools.config import build_option
-from easybuild.tools.filetools import apply_regex_substitutions, change_dir, copy_file, extract_file, mkdir
-from easybuild.tools.filetools import patch_perl_script_autoflush, remove_dir, symlink
+from easybuild.tools.filetools import CHECKSUM_TYPE_SHA256, adjust_permissions, apply_regex_substitutions, change_dir
+from easybuild.tools.filetools import compute_checksum, copy_file, extract_file, mkdir, patch_perl_script_autoflush
+from easybuild.tools.filetools import remove_dir, remove_file, symlink
 from easybuild.tools.modules import get_software_root, get_software_version
 from easybuild.tools.run import run_cmd, run_cmd_qa
 
 
+def symlink_testdata(src_dir, target_dir):
+    """
+    Create symlinks in target directory to all entries in specified directory with (read-only) test data.
+    Entries in target directory that are symlinks to a directory which clashes with a directory in the specified
+    directory are replaced by an actual directory, in which the contents of both directories are symlinked,
+    so test data archives that extract into the same directory are merged (like when they are extracted in place).
+    """
+    for entry in sorted(os.listdir(src_dir)):
+        src_path = os.path.join(src_dir, entry)
+        target_path = os.path.join(target_dir, entry)
+
+        if not os.path.lexists(target_path):
+            symlink(src_path, target_path)
+
+        elif os.path.isdir(src_path) and os.path.isdir(target_path):
+            if os.path.islink(target_path):
+                linked_dir = os.path.realpath(target_path)
+                remove_file(target_path)
+                mkdir(target_path)
+                symlink_testdata(linked_dir, target_path)
+            symlink_testdata(src_path, target_path)
+
+        elif os.path.islink(target_path) and not (os.path.isdir(src_path) or os.path.isdir(target_path)):
+            # file that is also included in an earlier test data archive: last one wins
+            remove_file(target_path)
+            symlink(src_path, target_path)
+
+        else:
+            raise EasyBuildError("Can not merge %s into %s: clash between file and directory", src_path, target_path)
+
+
 class EB_WPS(EasyBlock):
     """Support for building/installing WPS."""
 
@@ -86,6 +119,9 @@ class EB_WPS(EasyBlock):
             'buildtype': [None, "Specify the type of build (smpar: OpenMP, dmpar: MPI).", MANDATORY],
             'runtest': [True, "Build and run WPS tests", CUSTOM],
             'testdata': [None, "URL to test data required to run WPS test", CUSTOM],
+            'testdata_cache_dir': [None, "Directory in which extracted test data is kept (read-only) for reuse in "
+                                         "later builds, in a subdirectory named after the SHA256 checksum of "
+                                         "each test data archive", CUSTOM],
         }
         return EasyBlock.extra_options(extra_vars)
 
@@ -278,9 +314,17 @@ class EB_WPS(EasyBlock):
                     testdata_paths.append(path)
 
                 # unpack data
-                for path in testdata_paths:
-                    srcdir = extract_file(path, tmpdir, change_into_dir=False)
-                    change_dir(srcdir)
+                if self.cfg['testdata_cache_dir']:
+                    for path in testdata_paths:
+                        cached_dir = self.extract_testdata_cached(path, self.cfg['testdata_cache_dir'])
+                        # only symlink to (read-only) extracted test data,
+                        # files that are created/modified when running the tests end up in the temporary directory
+                        symlink_testdata(cached_dir, tmpdir)
+                    change_dir(tmpdir)
+                else:
+                    for path in testdata_paths:
+                        srcdir = extract_file(path, tmpdir, change_into_dir=False)
+                        change_dir(srcdir)
 
                 namelist_file = os.path.join(tmpdir, 'namelist.wps')
 
@@ -358,6 +402,45 @@ class EB_WPS(EasyBlock):
             except OSError as err:
                 raise EasyBuildError("Failed to run WPS test: %s", err)
 
+    def extract_testdata_cached(self, path, cache_dir):
+        """
+        Extract test data archive at specified path into subdirectory of specified cache directory,
+        named after SHA256 checksum of the archive, unless it was already extracted there by an earlier build.
+        Extracted test data is made read-only, since it is shared between builds.
+
+        :return: path to directory with extracted test data
+        """
+        checksum = compute_checksum(path, checksum_type=CHECKSUM_TYPE_SHA256)
+        cached_dir = os.path.join(cache_dir, checksum)
+
+        if os.path.isdir(cached_dir):
+            self.log.info("Reusing test data from %s extracted in %s", path, cached_dir)
+        else:
+            # extract in temporary location first, and only move it into place once extraction is complete,
+            # so a failed or concurrent extraction never results in incomplete test data being reused
+            mkdir(cache_dir, parents=True)
+            tmp_cached_dir = tempfile.mkdtemp(prefix=checksum + '.', dir=cache_dir)
+            extract_file(path, tmp_cached_dir, change_into_dir=False)
+            write_bits = stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH
+            for entry in os.listdir(tmp_cached_dir):
+                adjust_permissions(os.path.join(tmp_cached_dir, entry), write_bits, add=False, recursive=True)
+            # directory created by mkdtemp is only accessible by current user, but test data can be shared
+            adjust_permissions(tmp_cached_dir, stat.S_IRGRP | stat.S_IXGRP | stat.S_IROTH | stat.S_IXOTH,
+                               add=True, recursive=False)
+            try:
+                os.rename(tmp_cached_dir, cached_dir)
+                adjust_permissions(cached_dir, write_bits, add=False, recursive=False)
+                self.log.info("Extracted test data from %s in %s", path, cached_dir)
+            except OSError as err:
+                if os.path.isdir(cached_dir):
+                    self.log.info("Test data from %s was extracted in %s concurrently, using it", path, cached_dir)
+                    adjust_permissions(tmp_cached_dir, stat.S_IWUSR, add=True, recursive=True)
+                    remove_dir(tmp_cached_dir)
+                else:
+                    raise EasyBuildError("Failed to move extracted test data to %s: %s", cached_dir, err)
+
+        return cached_dir
+
     # installing is done in build_step, so we can run tests
     def install_step(self):
         """Building was done in install dir, so just do some cleanup here."""
@@ -32,6 +32,7 @@ EasyBuild support for building and installing Xmipp, implemented as an easyblock
 """
 import glob
 import os
+import time
 
 import easybuild.tools.environment as env
 from distutils.version import LooseVersion
@@ -206,13 +207,18 @@ class EB_Xmipp(SCons):
             copy_file(os.path.join(self.srcdir, 'cuFFTAdvisor', 'build', libname), xmipp_lib)
 
         self.cfg.update('buildopts', '--verbose')
+        start_time = time.time()
         for module in self.xmipp_modules:
             moddir = os.path.join(os.path.basename(self.srcdir), module)
             symlink(self.cfgfile, os.path.join(self.srcdir, module, 'install', 'xmipp.conf'))
             cwd = change_dir(moddir)
+            module_start_time = time.time()
             super(EB_Xmipp, self).build_step()
+            self.log.info("Building Xmipp module %s took %.1f seconds", module, time.time() - module_start_time)
             change_dir(cwd)
 
+        self.log.info("Building Xmipp modules took %.1f seconds", time.time() - start_time)
+
     def install_step(self):
         """Custom install step for Xmipp."""
 
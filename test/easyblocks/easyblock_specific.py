@@ -28,23 +28,36 @@ Unit tests for specific easyblocks.
 @author: Kenneth Hoste (Ghent University)
 """
 import copy
+import json
 import os
+import re
+import stat
 import sys
 import tempfile
 from unittest import TestCase, TestLoader, TextTestRunner
 from test.easyblocks.module import cleanup
 
 import easybuild.tools.options as eboptions
+from easybuild.easyblocks.generic.bundle import Bundle
+from easybuild.easyblocks.generic.cmdcp import CmdCp
+from easybuild.easyblocks.generic.configuremake import ConfigureMake
+from easybuild.easyblocks.generic.perlmodule import PerlModule
+from easybuild.easyblocks.generic.pythonpackage import PythonPackage
+from easybuild.easyblocks.generic.rubygem import RubyGem
 from easybuild.easyblocks.generic.toolchain import Toolchain
+from easybuild.easyblocks.utilities import parse_automake_test_results, parse_automake_test_suite_logs
+from easybuild.easyblocks.wps import symlink_testdata
 from easybuild.framework.easyblock import get_easyblock_instance
 from easybuild.framework.easyconfig.easyconfig import process_easyconfig
 from easybuild.tools import config
 from easybuild.tools.config import get_module_syntax
 from easybuild.tools.environment import modify_env
-from easybuild.tools.filetools import remove_dir, write_file
+from easybuild.tools.build_log import EasyBuildError
+from easybuild.tools.filetools import adjust_permissions, change_dir, mkdir, read_file, remove_dir, write_file
 from easybuild.tools.modules import modules_tool
 from easybuild.tools.options import set_tmpdir
 from easybuild.tools.py2vs3 import StringIO
+from easybuild.tools.run import run_cmd
 
 
 class EasyBlockSpecificTest(TestCase):
@@ -54,13 +67,22 @@ class EasyBlockSpecificTest(TestCase):
         """Test setup."""
         super(EasyBlockSpecificTest, self).setUp()
         self.tmpdir = tempfile.mkdtemp()
+        self.orig_workdir = os.getcwd()
 
         self.orig_sys_stdout = sys.stdout
         self.orig_sys_stderr = sys.stderr
         self.orig_environ = copy.deepcopy(os.environ)
 
+        # initialize configuration
+        cleanup()
+        eb_go = eboptions.parse_options(args=['--installpath=%s' % self.tmpdir])
+        config.init(eb_go.options, eb_go.get_options_by_section('config'))
+        config.init_build_options(build_options={'valid_module_classes': config.module_classes()})
+        del eb_go
+
     def tearDown(self):
         """Test cleanup."""
+        change_dir(self.orig_workdir)
         remove_dir(self.tmpdir)
 
         sys.stdout = self.orig_sys_stdout
@@ -83,6 +105,454 @@ class EasyBlockSpecificTest(TestCase):
         """Return output captured from stdout until now."""
         return sys.stdout.getvalue()
 
+    def parse_test_ec(self, ec_lines, easyblock=None, name='test', version='1.0', filename='test.eb'):
+        """
+        Write test easyconfig file, composed of standard header and specified lines, and return parsed easyconfig.
+        """
+        test_ec_lines = []
+        if easyblock:
+            test_ec_lines.append("easyblock = '%s'" % easyblock)
+        test_ec_lines.extend([
+            "name = '%s'" % name,
+            "version = '%s'" % version,
+            "homepage = 'https://example.com'",
+            "description = 'just a test'",
+            "toolchain = SYSTEM",
+        ])
+        test_ec_path = os.path.join(self.tmpdir, filename)
+        write_file(test_ec_path, '\n'.join(test_ec_lines + ec_lines))
+        return process_easyconfig(test_ec_path)[0]
+
+    def init_test_easyblock(self, *args, **kwargs):
+        """Create easyblock instance for test easyconfig file (see parse_test_ec)."""
+        return get_easyblock_instance(self.parse_test_ec(*args, **kwargs))
+
+    def test_bundle_parallel_components(self):
+        """Test concurrent installation of components in Bundle generic easyblock."""
+        srcdir = os.path.join(self.tmpdir, 'src')
+        installdir = os.path.join(self.tmpdir, 'inst')
+        for src in ['a.sh', 'b.sh', 'c.sh']:
+            write_file(os.path.join(srcdir, src), src)
+        mkdir(installdir)
+
+        test_ec_lines = [line % {'inst': installdir} for line in [
+            "default_easyblock = 'Binary'",
+            "components = [",
+            "    ('compC', '1.0', {",
+            "        'sources': ['c.sh'],",
+            "        'component_deps': ['compA', 'compB'],",
+            "        'install_cmd': 'test -f %(inst)s/a.txt && test -f %(inst)s/b.txt && touch %(inst)s/c.txt',",
+            "    }),",
+            "    ('compA', '1.0', {'sources': ['a.sh'], 'install_cmd': 'sleep 1 && touch %(inst)s/a.txt'}),",
+            "    ('compB', '1.0', {'sources': ['b.sh'], 'install_cmd': 'sleep 1 && touch %(inst)s/b.txt'}),",
+            "]",
+            "parallel_components = 2",
+        ]]
+        test_ec = self.parse_test_ec(test_ec_lines, easyblock='Bundle')
+
+        def init_bundle():
+            """Create Bundle instance to test with."""
+            bundle = get_easyblock_instance(test_ec)
+            self.assertTrue(isinstance(bundle, Bundle))
+            bundle.builddir, bundle.installdir = srcdir, installdir
+            bundle.src = [{'name': src, 'path': os.path.join(srcdir, src)} for src in ['a.sh', 'b.sh', 'c.sh']]
+            return bundle
+
+        self.mock_stdout(True)
+        bundle = init_bundle()
+        bundle.install_step()
+        self.mock_stdout(False)
+
+        for fn in ['a.txt', 'b.txt', 'c.txt']:
+            self.assertTrue(os.path.exists(os.path.join(installdir, fn)))
+
+        bundle.close_log()
+        logtxt = read_file(bundle.logfile)
+        for comp in ['compA', 'compB', 'compC']:
+            self.assertTrue("Installation of component %s v1.0 took" % comp in logtxt)
+
+        # components that can not be installed because of (cyclic) dependencies result in an error
+        test_ec_lines = [line.replace("('compA', '1.0', {", "('compA', '1.0', {'component_deps': ['compC'], ")
+                         for line in test_ec_lines]
+        test_ec = self.parse_test_ec(test_ec_lines, easyblock='Bundle', filename='test_cyclic_deps.eb')
+        bundle = init_bundle()
+        self.mock_stdout(True)
+        self.assertRaises(EasyBuildError, bundle.install_step)
+        self.mock_stdout(False)
+        bundle.close_log()
+
+    def test_bundle_parallel_components_start_dir(self):
+        """Test whether concurrently installed components are installed in their own start directory."""
+        srcdir = os.path.join(self.tmpdir, 'src')
+        installdir = os.path.join(self.tmpdir, 'inst')
+        mkdir(installdir)
+
+        comps = ['compA', 'compB', 'compC']
+        for comp in comps:
+            comp_dir = os.path.join(srcdir, comp)
+            configure = os.path.join(comp_dir, 'configure')
+            write_file(configure, "#!/bin/sh\necho %s > configured.txt\n" % comp)
+            adjust_permissions(configure, stat.S_IXUSR)
+            makefile_lines = [
+                "all:",
+                "\tcp configured.txt built.txt",
+                "install:",
+                "\tcp built.txt %s" % os.path.join(installdir, comp + '.txt'),
+            ]
+            write_file(os.path.join(comp_dir, 'Makefile'), '\n'.join(makefile_lines) + '\n')
+
+        test_ec_lines = [
+            "default_easyblock = 'ConfigureMake'",
+            "components = [",
+        ] + [
+            "    ('%s', '1.0', {'sources': ['%s.tar.gz'], 'start_dir': '%s'})," % (comp, comp,
+                                                                                   os.path.join(srcdir, comp))
+            for comp in comps
+        ] + [
+            "]",
+            "parallel_components = 3",
+        ]
+        bundle = self.init_test_easyblock(test_ec_lines, easyblock='Bundle')
+        bundle.builddir, bundle.installdir = srcdir, installdir
+        bundle.src = [{'name': '%s.tar.gz' % comp, 'path': os.path.join(srcdir, comp)} for comp in comps]
+
+        self.mock_stdout(True)
+        bundle.install_step()
+        self.mock_stdout(False)
+        bundle.close_log()
+
+        # each component must be configured, built and installed in its own start directory
+        for comp in comps:
+            self.assertEqual(read_file(os.path.join(installdir, comp + '.txt')), comp + '\n')
+
+    def test_cmdcp_build_step(self):
+        """Test build_step of CmdCp generic easyblock."""
+        srcdir = os.path.join(self.tmpdir, 'src')
+        sources = ['one.sh', 'two.sh', 'three.txt', 'four.sh']
+        for src in sources:
+            write_file(os.path.join(srcdir, src), src)
+
+        test_ec = self.parse_test_ec([
+            "cmds_map = [",
+            "    (r'.*\\.sh$', 'cat %(source)s > %(target)s.out'),",
+            "    ('.*', 'cp %(source)s %(target)s.copy'),",
+            "]",
+            "files_to_copy = []",
+            "parallel = 3",
+        ], easyblock='CmdCp')
+
+        cmdcp = get_easyblock_instance(test_ec)
+        self.assertTrue(isinstance(cmdcp, CmdCp))
+        cmdcp.cfg['start_dir'] = srcdir
+        cmdcp.src = [{'path': os.path.join(srcdir, src)} for src in sources]
+        cmdcp.build_step()
+
+        for target in ['one.out', 'two.out', 'three.copy', 'four.out']:
+            self.assertTrue(os.path.exists(os.path.join(srcdir, target)))
+        self.assertEqual(read_file(os.path.join(srcdir, 'four.out')), 'four.sh')
+
+        # output of each command is logged (only) once, in the order in which commands completed
+        cmdcp.close_log()
+        regex = re.compile(r'INFO cmd "(.*)" exited with exit code 0', re.M)
+        expected = [
+            'cat %s > one.out' % os.path.join(srcdir, 'one.sh'),
+            'cat %s > two.out' % os.path.join(srcdir, 'two.sh'),
+            'cp %s three.copy' % os.path.join(srcdir, 'three.txt'),
+            'cat %s > four.out' % os.path.join(srcdir, 'four.sh'),
+        ]
+        self.assertEqual(sorted(regex.findall(read_file(cmdcp.logfile))), sorted(expected))
+
+        # failing command results in an error
+        cmdcp = get_easyblock_instance(test_ec)
+        cmdcp.cfg['start_dir'] = srcdir
+        cmdcp.src = [{'path': os.path.join(srcdir, src)} for src in sources + ['nosuchfile.sh']]
+        self.assertRaises(EasyBuildError, cmdcp.build_step)
+        cmdcp.close_log()
+
+    def test_configuremake_monitor_steps(self):
+        """Test monitoring of resource usage of steps in ConfigureMake generic easyblock."""
+        app = self.init_test_easyblock(["monitor_steps = True"], easyblock='ConfigureMake')
+        self.assertTrue(isinstance(app, ConfigureMake))
+        mkdir(app.installdir, parents=True)
+
+        # command that uses ~100MB of memory for a couple of seconds
+        cmd = "%s -c 'import time; x = b\"x\" * (100 * 1024 * 1024); time.sleep(2)'" % sys.executable
+        app.run_step('build', [lambda x: lambda: run_cmd(cmd)])
+        app.close_log()
+
+        usage = app.step_resource_usage['build']
+        self.assertTrue(usage['wall_time'] >= 2)
+        self.assertTrue(usage['peak_rss'] >= 100 * 1024 * 1024)
+        self.assertTrue(usage['cpu_time'] >= 0)
+
+        logtxt = read_file(app.logfile)
+        self.assertTrue("Resource usage for build step: wall time" in logtxt)
+
+        usage_file = os.path.join(app.installdir, 'easybuild', 'step_resource_usage.json')
+        self.assertEqual(json.loads(read_file(usage_file)), {'build': usage})
+
+        # steps other than configure/build/test/install are not monitored
+        app.run_step('sanitycheck', [lambda x: lambda: None])
+        self.assertEqual(sorted(app.step_resource_usage.keys()), ['build'])
+
+    def test_parse_automake_test_results(self):
+        """Test parsing of test results produced by Automake test harness."""
+        tests_dir = os.path.join(self.tmpdir, 'tests')
+        trs_txt = {
+            'test1': ":test-result: PASS\n:global-test-result: PASS\n:recheck: no\n:copy-in-global-log: no\n",
+            'test2': ":test-result: SKIP\n:recheck: no\n",
+            # multiple results (e.g. TAP), no global result
+            'test3': ":test-result: PASS\n:test-result: FAIL\n:test-result: PASS\n",
+            os.path.join('sub', 'test4'): ":test-result: XFAIL\n:global-test-result: XFAIL\n",
+        }
+        for (test, txt) in trs_txt.items():
+            write_file(os.path.join(tests_dir, test + '.trs'), txt)
+            write_file(os.path.join(tests_dir, test + '.log'), "output for %s" % test)
+
+        test_times = {
+            os.path.join(tests_dir, 'test1.log'): 10.0,
+            os.path.join(tests_dir, 'test1.trs'): 12.5,
+            # unknown duration since no time for .trs file
+            os.path.join(tests_dir, 'test2.log'): 11.0,
+        }
+        expected = [
+            (os.path.join('sub', 'test4'), 'XFAIL', None),
+            ('test1', 'PASS', 2.5),
+            ('test2', 'SKIP', None),
+            ('test3', 'FAIL', None),
+        ]
+        self.assertEqual(parse_automake_test_results(tests_dir, test_times=test_times), expected)
+
+        test_suite_log_txt = '\n'.join([
+            "=====================================",
+            "   test 1.0: tests/test-suite.log",
+            "=====================================",
+            "",
+            "# TOTAL: 4",
+            "# PASS:  1",
+            "# SKIP:  1",
+            "# XFAIL: 1",
+            "# FAIL:  1",
+            "# XPASS: 0",
+            "# ERROR: 0",
+        ])
+        write_file(os.path.join(tests_dir, 'test-suite.log'), test_suite_log_txt)
+        expected = {
+            'test-suite.log': {'TOTAL': 4, 'PASS': 1, 'SKIP': 1, 'XFAIL': 1, 'FAIL': 1, 'XPASS': 0, 'ERROR': 0},
+        }
+        self.assertEqual(parse_automake_test_suite_logs(tests_dir), expected)
+
+    def test_gopackage_go_caches(self):
+        """Test setting up shared Go caches and local Go module proxy in GoPackage generic easyblock."""
+        go_cache_dir = os.path.join(self.tmpdir, 'go-cache')
+        proxy_dir = os.path.join(self.tmpdir, 'go-modules')
+        write_file(os.path.join(proxy_dir, 'pkg', 'mod', 'cache', 'download', 'example.com', 'foo', '@v', 'v1.0.zip'),
+                   '')
+
+        for key in ['GOCACHE', 'GOMODCACHE', 'GOPATH', 'GOPROXY', 'GOSUMDB']:
+            if key in os.environ:
+                del os.environ[key]
+
+        eb = self.init_test_easyblock([
+            "go_cache_dir = '%s'" % go_cache_dir,
+            "go_mod_proxy = '%s'" % proxy_dir,
+        ], easyblock='GoPackage')
+        eb.set_up_go_caches()
+        self.assertEqual(os.getenv('GOMODCACHE'), os.path.join(go_cache_dir, 'pkg', 'mod'))
+        self.assertEqual(os.getenv('GOCACHE'), os.path.join(go_cache_dir, 'build'))
+        # $GOPATH is not set to shared Go cache directory
+        self.assertEqual(os.getenv('GOPATH'), None)
+        self.assertEqual(os.getenv('GOPROXY'), 'file://%s' % os.path.join(proxy_dir, 'pkg', 'mod', 'cache', 'download'))
+        self.assertEqual(os.getenv('GOSUMDB'), 'off')
+        self.assertEqual(eb.go_cache_stats, {'modules': set(), 'build': (0, 0)})
+
+        # no shared Go caches if 'go_cache_dir' is set to False
+        del os.environ['GOMODCACHE']
+        del os.environ['GOCACHE']
+        eb.cfg['go_cache_dir'] = False
+        eb.cfg['go_mod_proxy'] = None
+        eb.go_cache_stats = None
+        eb.set_up_go_caches()
+        self.assertEqual(os.getenv('GOMODCACHE'), None)
+        self.assertEqual(os.getenv('GOCACHE'), None)
+        self.assertEqual(eb.go_cache_stats, None)
+
+        eb.cfg['go_mod_proxy'] = os.path.join(self.tmpdir, 'nosuchdir')
+        self.assertRaises(EasyBuildError, eb.set_up_go_caches)
+        eb.close_log()
+
+    def test_openfoam_reuse_platform_build_dir(self):
+        """Test reusing platform build directory of previous build in OpenFOAM easyblock."""
+        test_ec = self.parse_test_ec([
+            "skip_clean_if_unchanged = True",
+            "platform_build_cache_dir = '%s'" % os.path.join(self.tmpdir, 'cache'),
+        ], name='OpenFOAM', version='8')
+
+        def init_openfoam():
+            """Create OpenFOAM easyblock instance to test with."""
+            openfoam = get_easyblock_instance(test_ec)
+            openfoam.det_psubdir = lambda: 'linux64GccDPInt32Opt'
+            openfoam.src = [{'path': os.path.join(self.tmpdir, 'OpenFOAM-8.tar.gz')}]
+            openfoam.patches = []
+            return openfoam
+
+        openfoam = init_openfoam()
+        platform_dir = openfoam.det_platform_dir()
+        self.assertEqual(platform_dir, os.path.join(openfoam.installdir, 'OpenFOAM-8', 'platforms',
+                                                    'linux64GccDPInt32Opt'))
+        obj_file = os.path.join(platform_dir, 'src', 'OpenFOAM', 'test.o')
+        write_file(obj_file, 'object')
+        os.utime(obj_file, (1000000000, 1000000000))
+
+        # no copy of platform build directory yet, so nothing to reuse
+        openfoam.restore_platform_build_dir()
+        self.assertFalse(openfoam.skip_clean)
+        openfoam.save_platform_build_dir()
+        openfoam.close_log()
+
+        # platform build directory is restored (incl. timestamps) after installation directory was wiped
+        remove_dir(openfoam.installdir)
+        openfoam = init_openfoam()
+        openfoam.restore_platform_build_dir()
+        self.assertTrue(openfoam.skip_clean)
+        self.assertEqual(read_file(obj_file), 'object')
+        self.assertEqual(os.stat(obj_file).st_mtime, 1000000000)
+        openfoam.close_log()
+
+        # no reuse if build settings have changed
+        remove_dir(openfoam.installdir)
+        os.environ['CFLAGS'] = '-O1 -foo'
+        openfoam = init_openfoam()
+        openfoam.restore_platform_build_dir()
+        self.assertFalse(openfoam.skip_clean)
+        self.assertFalse(os.path.exists(obj_file))
+        openfoam.close_log()
+
+    def test_perlmodule_harness_env(self):
+        """Test whether Perl modules installed as extension of Perl can run tests in parallel."""
+        perl = self.init_test_easyblock(["exts_list = [('Foo', '1.0')]"], name='Perl', version='5.32.1')
+        self.assertTrue(isinstance(perl, ConfigureMake))
+        perl.cfg['parallel'] = 4
+        self.assertFalse(perl.cfg['parallel_make_check'])
+
+        if 'HARNESS_OPTIONS' in os.environ:
+            del os.environ['HARNESS_OPTIONS']
+
+        ext = PerlModule(perl, {'name': 'Foo', 'version': '1.0', 'options': {}})
+        self.assertFalse(ext.cfg['parallel_make_check'])
+        self.assertEqual(ext.harness_env(), '')
+
+        ext.cfg['parallel_make_check'] = True
+        self.assertEqual(ext.harness_env(), 'HARNESS_OPTIONS=j4')
+
+        # existing $HARNESS_OPTIONS is retained
+        os.environ['HARNESS_OPTIONS'] = 'j2'
+        self.assertEqual(ext.harness_env(), '')
+        del os.environ['HARNESS_OPTIONS']
+        perl.close_log()
+
+    def test_pythonpackage_run_install_cmd(self):
+        """Test scanning output of build/install commands in PythonPackage generic easyblock."""
+        test_ec = self.parse_test_ec([], easyblock='PythonPackage')
+        pypkg = get_easyblock_instance(test_ec)
+        self.assertTrue(isinstance(pypkg, PythonPackage))
+
+        cmd = '; '.join([
+            "echo 'Processing /tmp/test-1.0'",
+            "echo 'Collecting foo>=1.0 (from test==1.0)'",
+            "echo 'Downloading https://files.example.com/packages/foo-1.2.tar.gz' >&2",
+            "echo 'Successfully installed foo-1.2 test-1.0'",
+        ])
+        out = pypkg.run_install_cmd(cmd)
+        expected = '\n'.join([
+            "Processing /tmp/test-1.0",
+            "Collecting foo>=1.0 (from test==1.0)",
+            "Downloading https://files.example.com/packages/foo-1.2.tar.gz",
+            "Successfully installed foo-1.2 test-1.0",
+            '',
+        ])
+        self.assertEqual(out, expected)
+        # full output is available in install_cmd_output
+        self.assertEqual(pypkg.install_cmd_output, expected)
+
+        # output of failing command is reported in error message
+        try:
+            pypkg.run_install_cmd("echo 'Processing /tmp/test-1.0'; echo 'ERROR: oops'; exit 1")
+            self.assertTrue(False, "Running failing command should result in an error")
+        except EasyBuildError as err:
+            self.assertTrue('exited with exit code 1' in str(err), str(err))
+            self.assertTrue('ERROR: oops' in str(err), str(err))
+
+        pypkg.close_log()
+        logtxt = read_file(pypkg.logfile)
+        # lines that indicate downloaded dependencies are reported in log
+        for line in ["Collecting foo>=1.0 (from test==1.0)",
+                     "Downloading https://files.example.com/packages/foo-1.2.tar.gz"]:
+            self.assertTrue('Relevant line in output of cmd "%s": %s' % (cmd, line) in logtxt, line)
+        self.assertFalse('Relevant line in output of cmd "%s": Processing' % cmd in logtxt)
+
+        # in dry run mode, the actual command is only printed
+        cleanup()
+        eb_go = eboptions.parse_options(args=['--installpath=%s' % self.tmpdir])
+        config.init(eb_go.options, eb_go.get_options_by_section('config'))
+        config.init_build_options(build_options={
+            'extended_dry_run': True,
+            'valid_module_classes': config.module_classes(),
+        })
+        pypkg = get_easyblock_instance(test_ec)
+        self.assertTrue(pypkg.dry_run)
+        self.mock_stdout(True)
+        pypkg.run_install_cmd("pip install .")
+        stdout = self.get_stdout()
+        self.mock_stdout(False)
+        self.assertTrue('  running command "pip install ."' in stdout, stdout)
+        self.assertEqual(pypkg.install_cmd_output, '')
+        pypkg.close_log()
+
+    def test_rubygem_batch_install(self):
+        """Test installing Ruby gems in batch with RubyGem generic easyblock."""
+        ruby = self.init_test_easyblock(["batch_install = True", "parallel = 4"], easyblock='EB_Ruby', name='Ruby',
+                                        version='2.7.2')
+        ruby.installdir = os.path.join(self.tmpdir, 'inst')
+
+        gems = [RubyGem(ruby, {'name': name, 'version': '1.0'}) for name in ['foo', 'bar', 'baz']]
+        bindir = os.path.join(ruby.installdir, 'bin')
+        self.assertEqual(gems[0].gem_install_cmd(['foo-1.0.gem', 'bar-1.0.gem']),
+                         "MAKEFLAGS=-j4 gem install --bindir %s --local foo-1.0.gem bar-1.0.gem" % bindir)
+        gems[0].cfg['parallel'] = 1
+        self.assertEqual(gems[0].gem_install_cmd(['foo-1.0.gem']),
+                         "gem install --bindir %s --local foo-1.0.gem" % bindir)
+        gems[0].cfg['parallel'] = 4
+
+        # pending batch must be installed before an extension that is not a Ruby gem
+        ruby.ext_instances = gems[:2] + [object(), gems[2]]
+        self.assertEqual([gem.is_last_in_batch() for gem in gems], [False, True, True])
+
+        # fake 'gem' command that fails for Ruby gems with 'bar' in the name
+        gem_cmd = os.path.join(self.tmpdir, 'bin', 'gem')
+        write_file(gem_cmd, '\n'.join([
+            '#!/bin/bash',
+            'echo "gem $@" >> %s' % os.path.join(self.tmpdir, 'gem.log'),
+            'for arg in "$@"; do if [[ $arg == *bar* ]]; then echo "ERROR: $arg failed"; exit 1; fi; done',
+        ]))
+        adjust_permissions(gem_cmd, stat.S_IXUSR)
+        os.environ['PATH'] = '%s:%s' % (os.path.dirname(gem_cmd), os.getenv('PATH'))
+        os.environ['EBROOTRUBY'] = self.tmpdir
+
+        # failing batch is installed one by one to determine which Ruby gems are failing
+        ruby.ruby_gems_batch = [(name, '%s-1.0.gem' % name) for name in ['foo', 'bar', 'baz']]
+        try:
+            gems[2].install_batch()
+            self.assertTrue(False, "Installing batch of Ruby gems should fail")
+        except EasyBuildError as err:
+            self.assertTrue(re.search(r"installation of Ruby gems bar'?$", str(err)), str(err))
+        self.assertEqual(ruby.ruby_gems_batch, None)
+
+        gem_log = read_file(os.path.join(self.tmpdir, 'gem.log')).splitlines()
+        self.assertEqual([x.split()[-1] for x in gem_log], ['baz-1.0.gem', 'foo-1.0.gem', 'bar-1.0.gem', 'baz-1.0.gem'])
+        self.assertTrue(gem_log[0].endswith('--local foo-1.0.gem bar-1.0.gem baz-1.0.gem'))
+        ruby.close_log()
+
     def test_toolchain_external_modules(self):
         """Test use of Toolchain easyblock with external modules."""
 
@@ -200,6 +670,32 @@ class EasyBlockSpecificTest(TestCase):
                 extra_eb_env_vars.append(key)
         self.assertEqual(extra_eb_env_vars, [])
 
+    def test_wps_symlink_testdata(self):
+        """Test merging of (cached) extracted WPS test data via symlinks."""
+        testdata_a = os.path.join(self.tmpdir, 'a')
+        testdata_b = os.path.join(self.tmpdir, 'b')
+        for path in ['a/WPS_GEOG/x/one', 'a/WPS_GEOG/y', 'a/fnl_1', 'b/WPS_GEOG/x/two', 'b/WPS_GEOG/z', 'b/fnl_2']:
+            write_file(os.path.join(self.tmpdir, path), path)
+
+        target_dir = os.path.join(self.tmpdir, 'target')
+        mkdir(target_dir)
+        symlink_testdata(testdata_a, target_dir)
+        self.assertTrue(os.path.islink(os.path.join(target_dir, 'WPS_GEOG')))
+
+        # directories that are included in multiple test data archives are merged
+        symlink_testdata(testdata_b, target_dir)
+        geog_dir = os.path.join(target_dir, 'WPS_GEOG')
+        self.assertFalse(os.path.islink(geog_dir))
+        self.assertEqual(sorted(os.listdir(geog_dir)), ['x', 'y', 'z'])
+        self.assertEqual(sorted(os.listdir(os.path.join(geog_dir, 'x'))), ['one', 'two'])
+        self.assertEqual(read_file(os.path.join(geog_dir, 'x', 'one')), 'a/WPS_GEOG/x/one')
+        self.assertEqual(read_file(os.path.join(geog_dir, 'z')), 'b/WPS_GEOG/z')
+        self.assertEqual(sorted(os.listdir(target_dir)), ['WPS_GEOG', 'fnl_1', 'fnl_2'])
+
+        # clash between file and directory results in a clear error
+        write_file(os.path.join(self.tmpdir, 'c', 'fnl_1', 'foo'), 'foo')
+        self.assertRaises(EasyBuildError, symlink_testdata, os.path.join(self.tmpdir, 'c'), target_dir)
+
 
 def suite():
     """Return all easyblock-specific tests."""
@@ -34,7 +34,7 @@ import tempfile
 from unittest import TestLoader, TextTestRunner
 
 from easybuild.base.testing import TestCase
-from easybuild.easyblocks import VERSION
+from easybuild.easyblocks import VERBOSE_VERSION, VERSION
 from easybuild.tools.build_log import EasyBuildError
 from easybuild.tools.run import run_cmd
 
@@ -180,6 +180,43 @@ class GeneralEasyblockTest(TestCase):
         # importing EB_R class from easybuild.easyblocks.r still works fine
         run_cmd("python -c 'from easybuild.easyblocks.r import EB_R'")
 
+    def test_easyblocks_subdirs_other_repo(self):
+        """Test importing easyblock from subdirectory of another easybuild/easyblocks directory in search path."""
+        easyblocks_path = up(os.path.abspath(__file__), 3)
+
+        import easybuild.framework
+        framework_path = up(easybuild.framework.__file__, 3)
+
+        # other easybuild/easyblocks directory only provides easyblocks (in subdirectories),
+        # easybuild.easyblocks package is initialised via __init__.py of easybuild-easyblocks repo
+        other_repo_path = os.path.join(self.tmpdir, 'othereasyblocks')
+        pythonpath = os.environ.get('PYTHONPATH', '')
+        os.environ['PYTHONPATH'] = os.pathsep.join([easyblocks_path, framework_path, other_repo_path, pythonpath])
+
+        os.makedirs(os.path.join(other_repo_path, 'easybuild', 'easyblocks', 'z'))
+        for path, txt in [('__init__.py', NAMESPACE_EXTEND_PATH),
+                          (os.path.join('easyblocks', '__init__.py'), NAMESPACE_EXTEND_PATH),
+                          (os.path.join('easyblocks', 'z', 'zzzfoobar.py'), EASYBLOCK_BODY % 'zzzfoobar')]:
+            handle = open(os.path.join(other_repo_path, 'easybuild', path), 'w')
+            handle.write(txt)
+            handle.close()
+
+        os.chdir(self.tmpdir)
+
+        res = det_path_for_import('easybuild.easyblocks.zzzfoobar')
+        self.assertTrue(os.path.samefile(res, os.path.join(other_repo_path, 'easybuild', 'easyblocks', 'z',
+                                                           'zzzfoobar.py')))
+
+        # easyblocks from easybuild-easyblocks repo can still be imported
+        res = det_path_for_import('easybuild.easyblocks.gcc')
+        self.assertTrue(os.path.samefile(up(res, 4), easyblocks_path))
+
+    def test_verbose_version(self):
+        """Test VERBOSE_VERSION, for which git revision is determined lazily."""
+        self.assertTrue(str(VERBOSE_VERSION).startswith(str(VERSION)))
+        self.assertTrue(VERBOSE_VERSION >= VERSION)
+        self.assertTrue(VERBOSE_VERSION > '1.0')
+
 
 def suite():
     """Return all general easybuild-easyblocks tests."""
@@ -29,12 +29,16 @@ Unit tests to check that easyblocks are compatible with --module-only.
 """
 import copy
 import glob
+import json
 import os
 import re
+import shutil
 import stat
+import subprocess
 import sys
 import tempfile
-from unittest import TestLoader, TextTestRunner
+import time
+from unittest import TestLoader, TestSuite, TextTestRunner
 
 import easybuild.tools.module_naming_scheme.toolchain as mns_toolchain
 import easybuild.tools.options as eboptions
@@ -52,6 +56,7 @@ from easybuild.framework.easyconfig import MANDATORY
 from easybuild.framework.easyconfig.easyconfig import EasyConfig, get_easyblock_class
 from easybuild.framework.easyconfig.tools import get_paths_for
 from easybuild.tools import config
+from easybuild.tools.build_log import EasyBuildError
 from easybuild.tools.config import GENERAL_CLASS, Singleton
 from easybuild.tools.filetools import adjust_permissions, change_dir, mkdir, read_file, remove_dir
 from easybuild.tools.filetools import remove_file, write_file
@@ -61,6 +66,14 @@ from easybuild.tools.options import set_tmpdir
 
 TMPDIR = tempfile.mkdtemp()
 
+# environment variable to specify which shard of the --module-only tests should be run, in '<index>/<count>' format
+SHARD_ENV_VAR = 'EASYBLOCKS_TEST_MODULE_ONLY_SHARD'
+# environment variable to specify path to file to write results for a shard to (in JSON format)
+SHARD_RESULTS_ENV_VAR = 'EASYBLOCKS_TEST_MODULE_ONLY_SHARD_RESULTS'
+
+# time (in seconds) spent in --module-only test for each easyblock
+TIMINGS = {}
+
 
 def cleanup():
     """Perform cleanup of singletons and caches."""
@@ -339,11 +352,19 @@ def template_module_only_test(self, easyblock, name, version='1.3.2', extra_txt=
         self.assertTrue(False, "Class found in easyblock %s" % easyblock)
 
 
-def suite():
-    """Return all easyblock --module-only tests."""
+def suite(shard=None):
+    """
+    Return all easyblock --module-only tests.
+
+    :param shard: (<index>, <count>) tuple, to only return the tests for the specified shard of the easyblocks
+    """
     def make_inner_test(easyblock, **kwargs):
         def innertest(self):
-            template_module_only_test(self, easyblock, **kwargs)
+            start_time = time.time()
+            try:
+                template_module_only_test(self, easyblock, **kwargs)
+            finally:
+                TIMINGS[easyblock] = time.time() - start_time
         return innertest
 
     # initialize configuration (required for e.g. default modules_tool setting)
@@ -372,6 +393,10 @@ def suite():
     excluded_easyblocks = ['versionindependendpythonpackage.py']
     easyblocks = [e for e in easyblocks if os.path.basename(e) not in excluded_easyblocks]
 
+    if shard:
+        shard_idx, shard_cnt = shard
+        easyblocks = sorted(easyblocks)[shard_idx::shard_cnt]
+
     # add dummy PrgEnv-* modules, required for testing CrayToolchain easyblock
     for prgenv in ['PrgEnv-cray', 'PrgEnv-gnu', 'PrgEnv-intel', 'PrgEnv-pgi']:
         write_file(os.path.join(TMPDIR, 'modules', 'all', prgenv, '1.2.3'), "#%Module")
@@ -404,10 +429,84 @@ def suite():
         innertest.__name__ = "test_easyblock_%s" % '_'.join(easyblock.replace('.py', '').split('/'))
         setattr(ModuleOnlyTest, innertest.__name__, innertest)
 
-    return TestLoader().loadTestsFromTestCase(ModuleOnlyTest)
+    test_names = TestLoader().getTestCaseNames(ModuleOnlyTest)
+    if shard and shard[0] > 0:
+        # tests that are not specific to a particular easyblock are only included in the first shard
+        test_names = [x for x in test_names if x.startswith('test_easyblock_')]
+
+    return TestSuite([ModuleOnlyTest(x) for x in test_names])
+
+
+def run_shards(shard_cnt, slowest=10):
+    """
+    Run --module-only tests split in specified number of shards, each in a separate worker process,
+    and report the easyblocks for which the test took the most time.
+
+    :param shard_cnt: number of shards (worker processes) to use
+    :param slowest: number of slowest easyblocks to report
+    :return: True if all tests passed, False otherwise
+    """
+    workdir = tempfile.mkdtemp(prefix='easyblocks-module-only-shards-')
+
+    procs = []
+    for shard_idx in range(shard_cnt):
+        env = copy.deepcopy(os.environ)
+        env[SHARD_ENV_VAR] = '%d/%d' % (shard_idx, shard_cnt)
+        env[SHARD_RESULTS_ENV_VAR] = os.path.join(workdir, 'shard%d.json' % shard_idx)
+        # each worker gets its own temporary directory, to avoid that they interfere with each other
+        env['TMPDIR'] = tempfile.mkdtemp(prefix='shard%d-' % shard_idx, dir=workdir)
+
+        outfile = os.path.join(workdir, 'shard%d.out' % shard_idx)
+        with open(outfile, 'w') as out:
+            cmd = [sys.executable, '-m', 'test.easyblocks.module']
+            proc = subprocess.Popen(cmd, env=env, stdout=out, stderr=subprocess.STDOUT)
+        procs.append((shard_idx, proc, outfile, env[SHARD_RESULTS_ENV_VAR]))
+
+    success, test_cnt = True, 0
+    timings = {}
+    for shard_idx, proc, outfile, results_file in procs:
+        proc.wait()
+        try:
+            results = json.loads(read_file(results_file))
+        except (IOError, OSError, ValueError, EasyBuildError):
+            results = None
+
+        if results is None or results['failures'] or results['errors'] or proc.returncode:
+            success = False
+            sys.stderr.write("Shard %d/%d failed, output:\n%s\n" % (shard_idx, shard_cnt, read_file(outfile)))
+        if results:
+            test_cnt += results['tests']
+            timings.update(results['timings'])
+
+    print("Ran %d --module-only tests in %d shards" % (test_cnt, shard_cnt))
+    print("Slowest easyblocks:")
+    for easyblock, timing in sorted(timings.items(), key=lambda x: x[1], reverse=True)[:slowest]:
+        print("  %.2fs  %s" % (timing, easyblock))
+
+    shutil.rmtree(workdir)
+
+    return success
 
 
 if __name__ == '__main__':
-    res = TextTestRunner(verbosity=1).run(suite())
+    if len(sys.argv) == 3 and sys.argv[1] == '--shards':
+        sys.exit(not run_shards(int(sys.argv[2])))
+
+    shard = os.getenv(SHARD_ENV_VAR)
+    if shard:
+        shard = tuple(int(x) for x in shard.split('/'))
+
+    res = TextTestRunner(verbosity=1).run(suite(shard=shard))
+
+    results_file = os.getenv(SHARD_RESULTS_ENV_VAR)
+    if results_file:
+        results = {
+            'errors': len(res.errors),
+            'failures': len(res.failures),
+            'tests': res.testsRun,
+            'timings': TIMINGS,
+        }
+        write_file(results_file, json.dumps(results))
+
     remove_dir(TMPDIR)
     sys.exit(len(res.failures))